@@ -3,10 +3,14 @@ Configuration settings.
 Supports .env file and environment variables.
 """
 
+import os
+import re
 from enum import Enum
+from functools import cached_property, lru_cache
+from pathlib import Path
 from typing import Optional
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+import msgspec
 
 
 class TranscriptionMode(str, Enum):
@@ -17,12 +21,8 @@ class TranscriptionMode(str, Enum):
     AUTO = "auto"
 
 
-class Settings(BaseSettings):
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        case_sensitive=False,
-    )
+class Settings(msgspec.Struct, frozen=True, dict=True):
+    """Immutable settings. Build via `load_settings()` to read `.env` and environment."""
     
     # Server
     host: str = "0.0.0.0"
@@ -33,17 +33,30 @@ class Settings(BaseSettings):
     
     # Local Whisper
     whisper_model_size: str = "small"
+    whisper_model_path: Optional[str] = None  # local CT2 model dir (see scripts/prefetch_models.py)
+    whisper_models_dir: Optional[str] = None  # prefetched faster-whisper-<size> dirs, used when the size matches
     whisper_device: str = "auto"
+    whisper_compute_type: str = "auto"  # CTranslate2 type, e.g. int8_float16, bfloat16
+    whisper_beam_size: int = 1  # 1 = greedy decoding with temperature fallback
+    whisper_num_workers: int = 1  # concurrent transcriptions on one loaded model
+    whisper_cpu_workers: int = 0  # > 0: CPU transcription in this many processes
+    whisper_batch_size: int = 0  # > 0 enables BatchedInferencePipeline (e.g. 16)
     
     # Groq API
     groq_api_key: Optional[str] = None
     groq_model: str = "whisper-large-v3"
     groq_translation_model: str = "llama-3.3-70b-versatile"
+    groq_rpm: int = 20  # client-side request limit (0 = unlimited)
     
     # OpenAI API
     openai_api_key: Optional[str] = None
     openai_model: str = "whisper-1"
     openai_translation_model: str = "gpt-3.5-turbo"
+    openai_rpm: int = 50  # client-side request limit (0 = unlimited)
+    
+    # Translation
+    translate_concurrency: int = 4  # batches translated in parallel
+    translation_cache_path: Optional[str] = None  # SQLite file; default in the temp dir
     
     # Deepgram API (comma-separated keys for rotation)
     deepgram_api_keys: Optional[str] = None
@@ -51,6 +64,7 @@ class Settings(BaseSettings):
     # Performance
     max_audio_duration_seconds: int = 1200  # 20 minutes
     enable_vad: bool = True
+    max_jobs_in_memory: int = 1024  # LRU cap for in-memory job store
     
     # Supabase
     supabase_url: Optional[str] = None
@@ -61,9 +75,10 @@ class Settings(BaseSettings):
     # Security
     api_secret: Optional[str] = None  # If set, requires X-API-KEY header
     
-    def get_effective_mode(self) -> TranscriptionMode:
+    @cached_property
+    def effective_mode(self) -> TranscriptionMode:
         """
-        Determine effective mode.
+        Determine effective mode (computed once, settings are fixed after boot).
         AUTO prioritizes: Groq > Deepgram > OpenAI > Local.
         """
         if self.transcription_mode != TranscriptionMode.AUTO:
@@ -75,11 +90,67 @@ class Settings(BaseSettings):
         
         return TranscriptionMode.LOCAL
     
-    def get_deepgram_keys_list(self) -> list[str]:
-        """Parse comma-separated Deepgram keys into a list."""
+    @cached_property
+    def deepgram_keys_list(self) -> list[str]:
+        """Comma-separated Deepgram keys parsed into a list (computed once)."""
         if not self.deepgram_api_keys:
             return []
         return [k.strip() for k in self.deepgram_api_keys.split(",") if k.strip()]
+    
+    def get_effective_mode(self) -> TranscriptionMode:
+        """Determine effective mode. See `effective_mode`."""
+        return self.effective_mode
+    
+    def get_deepgram_keys_list(self) -> list[str]:
+        """Parse comma-separated Deepgram keys into a list. See `deepgram_keys_list`."""
+        return self.deepgram_keys_list
+
+
+_INLINE_COMMENT = re.compile(r"\s+#.*$")
+
+
+def _read_env_file(path: Path) -> dict[str, str]:
+    """
+    Parse a simple KEY=VALUE `.env` file (comments and blank lines ignored).
+    As in python-dotenv, ` #...` after an unquoted value is an inline comment.
+    """
+    values: dict[str, str] = {}
+    if not path.is_file():
+        return values
+    
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        if line.startswith("export "):
+            line = line[len("export "):]
+        key, _, value = line.partition("=")
+        value = value.strip()
+        if value[:1] in ("'", '"') and value.find(value[0], 1) != -1:
+            # Quoted: everything up to the closing quote, comments after it dropped
+            value = value[1:value.find(value[0], 1)]
+        else:
+            value = _INLINE_COMMENT.sub("", value)
+        values[key.strip().lower()] = value
+    return values
+
+
+def load_settings(env_file: Optional[str] = ".env") -> Settings:
+    """
+    Build settings from `.env` and environment variables (case-insensitive).
+    Environment variables take precedence over the `.env` file.
+    """
+    fields = set(Settings.__struct_fields__)
+    
+    raw = _read_env_file(Path(env_file)) if env_file else {}
+    raw.update({k.lower(): v for k, v in os.environ.items()})
+    data = {k: v for k, v in raw.items() if k in fields and v != ""}
+    
+    # strict=False coerces env strings into int/bool/enum fields
+    return msgspec.convert(data, Settings, strict=False)
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get settings singleton (`.env` and environment are read once per process)."""
+    return load_settings()
@@ -5,27 +5,59 @@ REST endpoints for video upload and processing.
 """
 
 import asyncio
-import base64
+import binascii
 import json
-from contextlib import asynccontextmanager
+import logging
+import logging.handlers
+import queue
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
-from typing import Any, AsyncGenerator, Dict, Optional
-import random
+from typing import Any, AsyncGenerator, Dict, Iterator, Optional, Union
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, Form, BackgroundTasks, HTTPException, Request
+import msgspec
+import orjson
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, Form, BackgroundTasks, HTTPException, Request, Security
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
+from fastapi.security import APIKeyHeader
 
-from config import settings
+from config import TranscriptionMode, get_settings
 from models.job import VideoJob, JobStatus, create_job, get_job, update_job
 from services.transcriber_factory import TranscriberFactory
 from services.translator import get_translator
-from services.transcriber_factory import TranscriberFactory
-from services.translator import get_translator
 from services.video_processor import get_video_processor
 from services.db import db_service
-from fastapi.security import APIKeyHeader
-from fastapi import Security
+
+settings = get_settings()
+
+logger = logging.getLogger("bypass.backend")
+
+
+@contextmanager
+def _queued_logging() -> Iterator[None]:
+    """
+    Route backend logs through a queue so stream I/O happens on the
+    listener thread instead of the event loop. The logger's previous
+    handlers are restored on exit, so it never points at a dead queue.
+    """
+    saved = (logger.handlers, logger.level, logger.propagate)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    try:
+        yield
+    finally:
+        listener.stop()
+        logger.handlers, level, logger.propagate = saved
+        logger.setLevel(level)
 
 # Security Scheme
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
@@ -40,21 +72,35 @@ async def verify_api_key(api_key: str = Security(api_key_header)):
             )
     return api_key
 
-transcriber: Any = None
+
+def dumps_json(obj: Any) -> str:
+    """Fast JSON encoding for WebSocket frames (orjson)."""
+    return orjson.dumps(obj, default=str).decode()
+
+
+async def send_fast(websocket: WebSocket, obj: Any) -> None:
+    """Send JSON as a text frame (clients parse event.data as a string)."""
+    await websocket.send_text(dumps_json(obj))
+
+# Accepted video upload extensions (without the dot)
+_ALLOWED_EXT = frozenset({"mp4", "mkv", "avi", "mov", "webm", "m4v"})
+_INVALID_EXT_DETAIL = "Invalid file type. Allowed: " + ", ".join(f".{e}" for e in sorted(_ALLOWED_EXT))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Initialize resources on startup, cleanup on shutdown."""
-    global transcriber
-    
-    print(f"🚀 Starting Backend (mode: {settings.get_effective_mode().value})...")
-    transcriber = await TranscriberFactory.create()
-    print("✅ Backend ready!")
-    
-    yield
-    
-    await get_translator().close()
-    print("👋 Shutting down...")
+    with _queued_logging():
+        logger.info("🚀 Starting Backend (mode: %s)...", settings.effective_mode.value)
+        app.state.transcriber = await TranscriberFactory.create()
+        logger.info("✅ Backend ready!")
+        
+        yield
+        
+        await app.state.translator.close()
+        close_transcriber = getattr(app.state.transcriber, "close", None)
+        if close_transcriber:
+            await close_transcriber()
+        logger.info("👋 Shutting down...")
 
 
 app = FastAPI(
@@ -62,34 +108,54 @@ app = FastAPI(
     version="0.2.0",
     lifespan=lifespan,
 )
+# Shared service handles, bound once (lifespan installs the transcriber)
+app.state.transcriber = None
+app.state.translator = get_translator()
+
+# Static public config (settings are immutable after boot)
+_CONFIG_PAYLOAD = {
+    "mode": settings.effective_mode.value,
+    "version": app.version,
+    "keys": {
+        "openai": bool(settings.openai_api_key),
+        "groq": bool(settings.groq_api_key),
+        "deepgram": bool(settings.deepgram_api_keys),
+        "supabase": bool(settings.supabase_url and settings.supabase_key),
+    },
+}
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[str, list[WebSocket]] = {}
+        self.active_connections: defaultdict[str, set[WebSocket]] = defaultdict(set)
 
     async def connect(self, websocket: WebSocket, job_id: str):
         await websocket.accept()
-        if job_id not in self.active_connections:
-            self.active_connections[job_id] = []
-        self.active_connections[job_id].append(websocket)
+        self.active_connections[job_id].add(websocket)
 
     def disconnect(self, websocket: WebSocket, job_id: str):
-        if job_id in self.active_connections:
-            self.active_connections[job_id].remove(websocket)
-            if not self.active_connections[job_id]:
+        connections = self.active_connections.get(job_id)
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
                 del self.active_connections[job_id]
 
-    async def broadcast_status(self, job_id: str, status: Dict[str, Any]):
-        if job_id in self.active_connections:
-            # Create a clean version for WebSocket (no internal paths)
-            # Send full status
-            clean_status = status
-            for connection in self.active_connections[job_id]:
-                try:
-                    await connection.send_json(clean_status)
-                except Exception:
-                    # Connection might be closed
-                    pass
+    async def broadcast_status(self, job_id: str, status: Union[Dict[str, Any], bytes]):
+        """Send status to all job subscribers. `status` may be pre-encoded JSON bytes."""
+        connections = list(self.active_connections.get(job_id, ()))
+        if not connections:
+            return
+        
+        # Serialize once, send to all subscribers concurrently
+        payload = status.decode() if isinstance(status, bytes) else dumps_json(status)
+        results = await asyncio.gather(
+            *(connection.send_text(payload) for connection in connections),
+            return_exceptions=True,
+        )
+        
+        # Drop connections that failed (likely closed)
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(connection, job_id)
 
 manager = ConnectionManager()
 
@@ -112,10 +178,8 @@ async def global_exception_handler(request: Request, exc: Exception):
     """
     Global exception handler.
     """
-    import traceback
     error_id = id(exc)
-    print(f"🔥 Internal Error ({error_id}): {str(exc)}")
-    # traceback.print_exc()
+    logger.error("🔥 Internal Error (%s): %s", error_id, exc)
 
     return JSONResponse(
         status_code=500,
@@ -143,16 +207,69 @@ async def get_config() -> dict:
     """
     Reveal public configuration and key status.
     """
-    return {
-        "mode": "auto",
-        "version": app.version,
-        "keys": {
-            "openai": bool(settings.openai_api_key),
-            "groq": bool(settings.groq_api_key),
-            "deepgram": bool(settings.deepgram_api_key),
-            "supabase": bool(settings.supabase_url and settings.supabase_key),
-        }
-    }
+    return _CONFIG_PAYLOAD
+
+
+# Live audio coalescing (16kHz 16-bit mono PCM = 32000 bytes/s).
+# Frames that queue up while a transcription is in flight are merged into one
+# call; a very short frame waits briefly for the next one.
+_LIVE_MIN_BATCH_BYTES = 16000  # 0.5s
+_LIVE_MAX_BATCH_BYTES = 960000  # 30s (Whisper window)
+_LIVE_COALESCE_WINDOW = 0.3  # seconds
+
+
+async def _transcribe_live(
+    websocket: WebSocket,
+    translator: Any,
+    audio_data: bytes,
+    source_lang: str,
+    target_lang: str,
+    show_original: bool,
+    seq: int,
+) -> None:
+    """Transcribe (and translate) one coalesced batch and send the result."""
+    transcriber = app.state.transcriber
+    if transcriber is None or not transcriber.is_ready:
+        await send_fast(websocket, {"error": "Transcriber not ready", "text": "", "seq": seq})
+        return
+    
+    # Transcribe
+    result = await transcriber.transcribe(audio_data)
+    result["seq"] = seq
+    
+    if result.get("error"):
+        await send_fast(websocket, result)
+        return
+    
+    original_text = result.get("text", "")
+    
+    # Translate
+    if target_lang and original_text:
+        detected_lang = result.get("language", source_lang)
+        
+        if detected_lang != target_lang:
+            translation = await translator.translate(
+                text=original_text,
+                target_lang=target_lang,
+                source_lang=detected_lang if detected_lang != "auto" else "auto",
+            )
+            result["translated"] = translation.get("translated", "")
+            result["original"] = original_text
+        else:
+            result["translated"] = original_text
+            result["original"] = original_text
+    else:
+        result["translated"] = ""
+        result["original"] = original_text
+    
+    result["showOriginal"] = show_original
+    
+    # Send full result
+    await send_fast(websocket, result)
+    
+    if original_text:
+        log_text = result.get("translated") or original_text
+        logger.debug("📤 [%s] %s...", result.get("provider", "local"), log_text[:80])
 
 
 @app.websocket("/ws/transcribe")
@@ -160,12 +277,49 @@ async def websocket_transcribe(websocket: WebSocket) -> None:
     """
     Real-time transcription.
     Expects JSON: {"audio": "<base64>", "sourceLang": "auto", "targetLang": "vi"}
+    Results carry a "seq" number so the client can order them.
     """
     await websocket.accept()
     client_id = id(websocket)
-    print(f"🔌 Client {client_id} connected")
+    logger.info("🔌 Client %s connected", client_id)
+    
+    translator = app.state.translator
+    # (audio, source_lang, target_lang, show_original)
+    frames: asyncio.Queue[tuple[bytes, str, str, bool]] = asyncio.Queue()
+    
+    async def process_frames() -> None:
+        loop = asyncio.get_running_loop()
+        seq = 0
+        carry: Optional[tuple[bytes, str, str, bool]] = None
+        
+        while True:
+            audio_data, *options = carry or await frames.get()
+            carry = None
+            buf = bytearray(audio_data)
+            deadline = loop.time() + _LIVE_COALESCE_WINDOW
+            
+            while len(buf) < _LIVE_MAX_BATCH_BYTES:
+                try:
+                    if frames.empty() and len(buf) < _LIVE_MIN_BATCH_BYTES:
+                        frame = await asyncio.wait_for(frames.get(), max(deadline - loop.time(), 0))
+                    else:
+                        frame = frames.get_nowait()
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if list(frame[1:]) != options:
+                    # Language settings changed: keep for the next batch
+                    carry = frame
+                    break
+                buf += frame[0]
+            
+            try:
+                await _transcribe_live(websocket, translator, bytes(buf), *options, seq=seq)
+            except Exception as e:
+                if "disconnect" not in str(e).lower():
+                    logger.error("❌ Error with client %s: %s", client_id, e)
+            seq += 1
     
-    translator = get_translator()
+    worker = asyncio.create_task(process_frames())
     
     try:
         while True:
@@ -180,13 +334,14 @@ async def websocket_transcribe(websocket: WebSocket) -> None:
                 audio_data = message["bytes"]
             elif "text" in message:
                 try:
-                    data = json.loads(message["text"])
-                    audio_data = base64.b64decode(data.get("audio", ""))
+                    data = orjson.loads(message["text"])
+                    audio_b64 = data.get("audio")
+                    audio_data = binascii.a2b_base64(audio_b64) if audio_b64 else b""
                     source_lang = data.get("sourceLang", "auto")
                     target_lang = data.get("targetLang", "")
                     show_original = data.get("showOriginal", True)
-                except (json.JSONDecodeError, KeyError) as e:
-                    await websocket.send_json({"error": f"Invalid message format: {e}"})
+                except (orjson.JSONDecodeError, binascii.Error, KeyError) as e:
+                    await send_fast(websocket, {"error": f"Invalid message format: {e}"})
                     continue
             else:
                 continue
@@ -194,60 +349,20 @@ async def websocket_transcribe(websocket: WebSocket) -> None:
             if not audio_data:
                 continue
             
-            if transcriber is None or not transcriber.is_ready:
-                await websocket.send_json({"error": "Transcriber not ready", "text": ""})
-                continue
-            
-            # Transcribe
-            result = await transcriber.transcribe(audio_data)
-            
-            if result.get("error"):
-                await websocket.send_json(result)
-                continue
-            
-            original_text = result.get("text", "")
-            
-            # Translate
-            if target_lang and original_text:
-                detected_lang = result.get("language", source_lang)
-                
-                if detected_lang != target_lang:
-                    translation = await translator.translate(
-                        text=original_text,
-                        target_lang=target_lang,
-                        source_lang=detected_lang if detected_lang != "auto" else "auto",
-                    )
-                    result["translated"] = translation.get("translated", "")
-                    result["original"] = original_text
-                else:
-                    result["translated"] = original_text
-                    result["original"] = original_text
-            else:
-                result["translated"] = ""
-                result["original"] = original_text
-            
-            result["showOriginal"] = show_original
-
-            
-            # Sanitize before sending
-            # Send full result
-            clean_result = result
-            await websocket.send_json(clean_result)
-            
-            if original_text:
-                log_text = result.get("translated") or original_text
-                print(f"📤 [{result.get('provider', 'local')}] {log_text[:80]}...")
+            frames.put_nowait((audio_data, source_lang, target_lang, show_original))
             
     except WebSocketDisconnect:
-        print(f"🔌 Client {client_id} disconnected")
+        logger.info("🔌 Client %s disconnected", client_id)
     except Exception as e:
         error_msg = str(e)
         if "disconnect" not in error_msg.lower():
-            print(f"❌ Error with client {client_id}: {e}")
+            logger.error("❌ Error with client %s: %s", client_id, e)
         try:
             await websocket.close(code=1011, reason=str(e))
         except Exception:
             pass
+    finally:
+        worker.cancel()
 
 
 # ============================================================================
@@ -259,12 +374,12 @@ async def websocket_job_status(websocket: WebSocket, job_id: str) -> None:
     """WebSocket endpoint for real-time job status updates."""
     await manager.connect(websocket, job_id)
     try:
-        # Send initial status immediately
+        # Send initial status immediately (to the new subscriber only)
         job = get_job(job_id)
         if job:
-            await manager.broadcast_status(job_id, job.model_dump())
+            await websocket.send_text(msgspec.json.encode(job).decode())
         else:
-            await websocket.send_json({"error": "Job not found", "status": "error"})
+            await send_fast(websocket, {"error": "Job not found", "status": "error"})
             
         while True:
             # Just keep the connection alive, we primarily push
@@ -274,12 +389,39 @@ async def websocket_job_status(websocket: WebSocket, job_id: str) -> None:
     except Exception:
         manager.disconnect(websocket, job_id)
 
-async def update_job_and_broadcast(job_id: str, **kwargs) -> None:
-    """Update job and broadcast via WebSocket."""
-    update_job(job_id, **kwargs)
-    job = get_job(job_id)
-    if job:
-        await manager.broadcast_status(job_id, job.model_dump())
+def job_status_payload(job: VideoJob) -> Union[Dict[str, Any], bytes]:
+    """
+    Status payload for WebSocket pushes.
+    Progress ticks only carry the small fields; the full job (with segments)
+    is sent, pre-encoded, once the job reaches a terminal state.
+    """
+    if job.status in (JobStatus.DONE, JobStatus.ERROR):
+        return msgspec.json.encode(job)
+    return {
+        "id": job.id,
+        "status": job.status.value,
+        "progress": job.progress,
+        "error_message": job.error_message,
+    }
+
+# Skip progress ticks smaller than this (same status) since the last push
+_MIN_PROGRESS_DELTA = 2
+
+async def update_job_and_broadcast(job_id: str, **kwargs) -> Optional[VideoJob]:
+    """Update job and broadcast via WebSocket (skipped when nobody listens)."""
+    job = update_job(job_id, **kwargs)
+    if not job or job_id not in manager.active_connections:
+        return job
+    
+    # Terminal states are always sent
+    if job.status not in (JobStatus.DONE, JobStatus.ERROR):
+        # Kept on the job (not encoded), so it goes away with the job
+        last = getattr(job, "_last_broadcast", None)
+        if last and last[0] == job.status and job.progress - last[1] < _MIN_PROGRESS_DELTA:
+            return job
+        job._last_broadcast = (job.status, job.progress)
+    await manager.broadcast_status(job_id, job_status_payload(job))
+    return job
 
 async def process_video_job(job_id: str) -> None:
     """Background task to process uploaded video."""
@@ -288,28 +430,31 @@ async def process_video_job(job_id: str) -> None:
         return
     
     processor = get_video_processor()
-    translator = get_translator()
+    transcriber = app.state.transcriber
+    translator = app.state.translator
     
     try:
-        # 1. Extract audio
-        audio_path = await processor.extract_audio(job)
+        # 1. Extract audio (local Whisper takes PCM in memory; cloud providers
+        #    need a file on disk to chunk large audio)
+        if settings.effective_mode == TranscriptionMode.LOCAL:
+            audio_input = await processor.extract_audio_to_bytes(job)
+        else:
+            audio_input = await processor.extract_audio(job)
         
         # 2. Transcribe
         await update_job_and_broadcast(job_id, status=JobStatus.TRANSCRIBING, progress=30)
         # Sync to DB
-        await db_service.save_job(job.model_dump(), job.allow_collection)
+        await db_service.save_job(msgspec.to_builtins(job), job.allow_collection)
         
         if transcriber is None or not transcriber.is_ready:
             raise RuntimeError("Transcriber not ready")
         
-        # Pass audio path directly to save memory
-        
         async def transcription_progress(current: int, total: int):
             # Map chunk progress (1 to total) to 30%-50% range
             progress = 30 + int((current / total) * 20)
             await update_job_and_broadcast(job_id, progress=progress)
             
-        result = await transcriber.transcribe(audio_path, progress_callback=transcription_progress)
+        result = await transcriber.transcribe(audio_input, progress_callback=transcription_progress)
         
         if result.get("error"):
             raise RuntimeError(result["error"])
@@ -317,7 +462,7 @@ async def process_video_job(job_id: str) -> None:
         segments = result.get("segments", [])
         detected_lang = result.get("language", job.source_lang)
         
-        print(f"🌍 Language Logic: Source={job.source_lang}, Detected={detected_lang}, Target={job.target_lang}")
+        logger.info("🌍 Language Logic: Source=%s, Detected=%s, Target=%s", job.source_lang, detected_lang, job.target_lang)
         
         await update_job_and_broadcast(job_id, progress=50)
         
@@ -327,44 +472,44 @@ async def process_video_job(job_id: str) -> None:
             
             texts_to_translate = [seg.get("text", "") for seg in segments]
             
-            translated_texts = await translator.translate_batch(
-                texts=texts_to_translate,
+            # Translate each distinct non-empty text once, then scatter back
+            unique_texts = list(dict.fromkeys(t for t in texts_to_translate if t))
+            translated_unique = await translator.translate_batch(
+                texts=unique_texts,
                 target_lang=job.target_lang,
                 source_lang=detected_lang if detected_lang != "auto" else "auto"
             )
+            translations = dict(zip(unique_texts, translated_unique))
             
-            for i, (seg, translated_text) in enumerate(zip(segments, translated_texts)):
-                seg["translated"] = translated_text
-                # Update progress periodically
-                if i % 20 == 0:
-                    progress = 55 + int((i / max(len(segments), 1)) * 20)
-                    await update_job_and_broadcast(job_id, progress=progress)
+            for seg, text in zip(segments, texts_to_translate):
+                seg["translated"] = translations.get(text, text)
             
-            print(f"✨ Translated {len(segments)} segments to {job.target_lang}")
+            logger.info("✨ Translated %d segments (%d unique) to %s", len(segments), len(unique_texts), job.target_lang)
         else:
-            print(f"⏭️ Skipping translation: Detected language matches target ({detected_lang})")
+            logger.info("⏭️ Skipping translation: Detected language matches target (%s)", detected_lang)
             for seg in segments:
                 seg["translated"] = seg.get("text", "")
         
-        await update_job_and_broadcast(job_id, progress=75)
+        job = await update_job_and_broadcast(job_id, progress=75)
+        if job is None:
+            raise RuntimeError("Job no longer exists")
         
-        # 4. Generate SRT
+        # 4. Generate SRT (updates job in place)
         await processor.generate_srt(job, segments)
         
         # 5. Burn subtitles if requested
-        job = get_job(job_id)  # Refresh job
-        if job and job.burn_subtitles:
+        if job.burn_subtitles:
             await processor.burn_subtitles(job)
         
         # Done!
         await update_job_and_broadcast(job_id, status=JobStatus.DONE, progress=100)
         # Final Sync to DB (will also save to training_datasets if done)
-        await db_service.save_job(job.model_dump(), job.allow_collection)
-        print(f"✅ Job {job_id} completed successfully")
+        await db_service.save_job(msgspec.to_builtins(job), job.allow_collection)
+        logger.info("✅ Job %s completed successfully", job_id)
         
     except Exception as e:
         # Log real error but hide it in job status
-        print(f"❌ Job {job_id} failed: {e}")
+        logger.error("❌ Job %s failed: %s", job_id, e)
         await update_job_and_broadcast(job_id, status=JobStatus.ERROR, error_message=str(e))
 
 
@@ -386,10 +531,10 @@ async def upload_video(
         raise HTTPException(status_code=400, detail="No file uploaded")
     
     # Validate file type
-    allowed_extensions = {".mp4", ".mkv", ".avi", ".mov", ".webm", ".m4v"}
-    ext = Path(file.filename).suffix.lower()
-    if ext not in allowed_extensions:
-        raise HTTPException(status_code=400, detail=f"Invalid file type. Allowed: {allowed_extensions}")
+    _, dot, ext = file.filename.rpartition(".")
+    ext = ext.lower() if dot else ""
+    if ext not in _ALLOWED_EXT:
+        raise HTTPException(status_code=400, detail=_INVALID_EXT_DETAIL)
     
     # Create job
     job = create_job(
@@ -401,17 +546,16 @@ async def upload_video(
     job.allow_collection = allow_collection
     
     # Save initial state to DB (if allowed)
-    await db_service.save_job(job.model_dump(), allow_collection)
+    await db_service.save_job(msgspec.to_builtins(job), allow_collection)
     
-    # Save file
+    # Save file (streamed from the spooled upload, never fully in memory)
     processor = get_video_processor()
-    file_content = await file.read()
-    await processor.save_uploaded_file(job, file_content, file.filename)
+    await processor.save_uploaded_file(job, file.file, file.filename)
     
     # Start background processing
     background_tasks.add_task(process_video_job, job.id)
     
-    print(f"📥 Received video: {file.filename} (job: {job.id})")
+    logger.info("📥 Received video: %s (job: %s)", file.filename, job.id)
     
     return {
         "job_id": job.id,
@@ -463,7 +607,7 @@ async def update_job_consent(job_id: str, request: Request) -> dict:
         
         if allow:
             # Sync current state to DB
-            await db_service.save_job(job.model_dump(), True)
+            await db_service.save_job(msgspec.to_builtins(job), True)
             msg = "Data collection enabled. Job saved to Cloud."
         else:
             # REVOKE: Delete from DB immediately
@@ -521,6 +665,7 @@ async def proxy_process(
     Client sends audio -> Server transcribes (Rotation) -> Server translates -> Client receives text.
     Keys are kept secure on server.
     """
+    transcriber = app.state.transcriber
     if not transcriber:
         raise HTTPException(status_code=503, detail="Server initializing")
         
@@ -547,7 +692,7 @@ async def proxy_process(
             detected_lang = result.get("language", source_lang)
             
             # Use server-side translator (Groq/OpenAI)
-            translator = get_translator()
+            translator = app.state.translator
             
             # We might want to pass context to translator if supported
             # consistently. For now, basic translation.
@@ -573,7 +718,7 @@ async def proxy_process(
         }
 
     except Exception as e:
-        print(f"❌ Proxy Error: {e}")
+        logger.error("❌ Proxy Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
@@ -3,12 +3,18 @@ Video Job Models
 Track video processing jobs and their status.
 """
 
+import asyncio
+import logging
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel, Field
+import msgspec
+
+from config import get_settings
 
 
 class JobStatus(str, Enum):
@@ -21,10 +27,14 @@ class JobStatus(str, Enum):
     ERROR = "error"
 
 
-class VideoJob(BaseModel):
-    """Represents a video processing job."""
+class VideoJob(msgspec.Struct, kw_only=True, dict=True):
+    """
+    Represents a video processing job.
+    dict=True lets callers keep transient per-job state (e.g. the last
+    broadcast) as plain attributes; those are never encoded.
+    """
     
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = msgspec.field(default_factory=lambda: uuid.uuid4().hex)
     status: JobStatus = JobStatus.PENDING
     progress: int = 0  # 0-100
     
@@ -44,15 +54,43 @@ class VideoJob(BaseModel):
     burned_video_path: Optional[str] = None
     
     # Metadata
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: float = msgspec.field(default_factory=time.time)  # epoch seconds
     error_message: Optional[str] = None
     
     # Transcription results
-    segments: list[dict] = Field(default_factory=list)
+    segments: list[dict] = msgspec.field(default_factory=list)
+    
+    @property
+    def created_at_iso(self) -> str:
+        """Creation time as local ISO-8601 string (rendered on demand)."""
+        return datetime.fromtimestamp(self.created_at).isoformat()
 
 
 # In-memory job storage (for simplicity, can be replaced with Redis/DB later)
-_jobs: dict[str, VideoJob] = {}
+# Bounded LRU: least recently used jobs are evicted once the cap is reached.
+# At least one slot, so create_job never pops from an empty dict
+MAX_JOBS = max(1, get_settings().max_jobs_in_memory)
+_jobs: "OrderedDict[str, VideoJob]" = OrderedDict()
+# Strong refs to in-flight eviction writes (the loop only keeps weak ones)
+_persist_tasks: "set[asyncio.Task]" = set()
+
+logger = logging.getLogger("bypass.backend")
+
+
+def _persist_evicted(job: VideoJob) -> None:
+    """Sync an evicted job to DB (no-op unless collection is allowed)."""
+    if not job.allow_collection:
+        return
+    
+    from services.db import db_service
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.warning("No running event loop; evicted job %s was not persisted", job.id)
+        return
+    task = loop.create_task(db_service.save_job(msgspec.to_builtins(job), job.allow_collection))
+    _persist_tasks.add(task)
+    task.add_done_callback(_persist_tasks.discard)
 
 
 def create_job(filename: str, source_lang: str = "auto", target_lang: str = "vi", burn: bool = False) -> VideoJob:
@@ -64,19 +102,27 @@ def create_job(filename: str, source_lang: str = "auto", target_lang: str = "vi"
         burn_subtitles=burn,
         allow_collection=False,  # Default to False until explicitly enabled
     )
+    while len(_jobs) >= MAX_JOBS:
+        _, evicted = _jobs.popitem(last=False)
+        _persist_evicted(evicted)
     _jobs[job.id] = job
     return job
 
 
 def get_job(job_id: str) -> Optional[VideoJob]:
     """Get job by ID."""
-    return _jobs.get(job_id)
+    job = _jobs.get(job_id)
+    if job:
+        _jobs.move_to_end(job_id)
+    return job
 
 
 def update_job(job_id: str, **kwargs) -> Optional[VideoJob]:
     """Update job fields."""
     job = _jobs.get(job_id)
     if job:
+        # A job being worked on is in use: keep it away from the LRU end
+        _jobs.move_to_end(job_id)
         for key, value in kwargs.items():
             if hasattr(job, key):
                 setattr(job, key, value)
@@ -0,0 +1,62 @@
+"""
+Prefetch Whisper models at build time.
+
+Downloads the CTranslate2 weights for a faster-whisper model into a local
+directory, so WhisperModel loads from disk instead of hitting the Hub on
+first start. Set WHISPER_MODELS_DIR to --output-dir (used while
+WHISPER_MODEL_SIZE matches), or WHISPER_MODEL_PATH to the printed directory.
+
+Optionally converts a Transformers checkpoint (e.g. a fine-tuned model)
+to CTranslate2 with --convert, which needs `transformers` installed.
+
+Usage:
+    python scripts/prefetch_models.py --size small --output-dir /app/whisper-models
+    python scripts/prefetch_models.py --convert openai/whisper-large-v3 --quantization int8_float16
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def prefetch(size: str, output_dir: Path) -> Path:
+    from faster_whisper import download_model
+
+    target = output_dir / f"faster-whisper-{size}"
+    download_model(size, output_dir=str(target))
+    return target
+
+
+def convert(model_id: str, output_dir: Path, quantization: str) -> Path:
+    from ctranslate2.converters import TransformersConverter
+
+    target = output_dir / model_id.replace("/", "--")
+    converter = TransformersConverter(
+        model_id, copy_files=["tokenizer.json", "preprocessor_config.json"]
+    )
+    converter.convert(str(target), quantization=quantization, force=True)
+    return target
+
+
+def main() -> None:
+    from config import get_settings
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", default=get_settings().whisper_model_size)
+    parser.add_argument("--output-dir", type=Path, default=Path("whisper-models"))
+    parser.add_argument("--convert", metavar="HF_MODEL_ID")
+    parser.add_argument("--quantization", default="int8_float16")
+    args = parser.parse_args()
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    if args.convert:
+        target = convert(args.convert, args.output_dir, args.quantization)
+    else:
+        target = prefetch(args.size, args.output_dir)
+    print(f"✅ Model ready at {target}")
+
+
+if __name__ == "__main__":
+    main()
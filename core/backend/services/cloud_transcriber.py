@@ -4,41 +4,44 @@ Cloud Transcription Service - Groq & OpenAI Whisper APIs
 Handles speech-to-text via cloud APIs for users without GPU.
 """
 
+import io
+import itertools
+import logging
+import math
 import os
-import json
 import asyncio
+import struct
 import tempfile
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Union
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Union
 
+import numpy as np
 
-class CloudTranscriberBase(ABC):
-    """Base class for cloud transcription services."""
-    
-    @abstractmethod
-    async def transcribe(self, audio_data: Union[bytes, str], progress_callback: Any = None) -> dict[str, Any]:
-        """Transcribe audio data."""
-        pass
-    
-    @abstractmethod
-    async def is_available(self) -> bool:
-        """Check if the service is available."""
-        pass
+from services.transcription_merger import TranscriptionMerger
 
-    def _pcm_to_wav(self, pcm_data: bytes, sample_rate: int = 16000) -> bytes:
-        """Convert PCM 16-bit data to WAV format."""
-        import struct
-        
+logger = logging.getLogger("bypass.backend")
+
+# 16kHz, 16-bit mono PCM
+PCM_BYTES_PER_SECOND = 16000 * 2
+
+WAV_HEADER_SIZE = 44
+# Prebuilt 16-bit mono WAV headers by sample rate; only the two size fields vary
+_WAV_HEADER_CACHE: dict[int, bytes] = {}
+
+
+def _wav_header_template(sample_rate: int) -> bytes:
+    header = _WAV_HEADER_CACHE.get(sample_rate)
+    if header is None:
         num_channels = 1
         bits_per_sample = 16
         byte_rate = sample_rate * num_channels * bits_per_sample // 8
         block_align = num_channels * bits_per_sample // 8
-        data_size = len(pcm_data)
-        
         header = struct.pack(
             '<4sI4s4sIHHIIHH4sI',
             b'RIFF',
-            36 + data_size,
+            36,
             b'WAVE',
             b'fmt ',
             16,
@@ -49,20 +52,140 @@ class CloudTranscriberBase(ABC):
             block_align,
             bits_per_sample,
             b'data',
-            data_size,
+            0,
         )
+        _WAV_HEADER_CACHE[sample_rate] = header
+    return header
+
+
+class CloudTranscriberBase(ABC):
+    """Base class for cloud transcription services."""
+    
+    @abstractmethod
+    async def transcribe(self, audio_data: Union[bytes, str], progress_callback: Any = None) -> dict[str, Any]:
+        """Transcribe audio data."""
+        pass
+    
+    @abstractmethod
+    async def is_available(self) -> bool:
+        """Check if the service is available."""
+        pass
+
+    def _wav_header(self, data_size: int, sample_rate: int = 16000) -> bytes:
+        """44-byte WAV header for `data_size` bytes of PCM 16-bit mono."""
+        header = bytearray(_wav_header_template(sample_rate))
+        struct.pack_into('<I', header, 4, 36 + data_size)
+        struct.pack_into('<I', header, 40, data_size)
+        return bytes(header)
+
+    def _pcm_to_wav(self, pcm_data: bytes, sample_rate: int = 16000) -> bytes:
+        """Convert PCM 16-bit data to WAV format (single in-memory buffer)."""
+        return self._wav_header(len(pcm_data), sample_rate) + pcm_data
+
+    def _write_wav_tempfile(self, pcm_data: bytes, sample_rate: int = 16000) -> str:
+        """Write PCM as a WAV temp file (header and payload written separately, no concat copy)."""
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            temp_file.write(self._wav_header(len(pcm_data), sample_rate))
+            temp_file.write(pcm_data)
+            return temp_file.name
+
+    # Max chunks sent to the provider at once
+    max_concurrent_chunks: int = 5
+
+    async def _transcribe_chunks_parallel(
+        self,
+        chunks: Union[list[str], AsyncIterator[tuple[str, float]]],
+        source_path: str,
+        provider: str,
+        progress_callback: Any = None,
+        max_concurrent: int | None = None,
+        total: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Transcribe chunks concurrently (bounded by a semaphore) and merge them.
+        `chunks` may be an async iterator of (path, start seconds) (see _chunk_audio)
+        so uploads start while later chunks are still being cut; pass `total`
+        for progress then. Chunk starts are used to place segments on the timeline.
+        On the first failing chunk, outstanding chunks are cancelled and its
+        error result (or exception) is returned/raised.
+        """
+        sem = asyncio.Semaphore(max_concurrent or self.max_concurrent_chunks)
+        if total is None and isinstance(chunks, list):
+            total = len(chunks)
+        completed = 0
+        
+        async def run(i: int, chunk_path: str) -> tuple[int, dict[str, Any]]:
+            nonlocal completed
+            async with sem:
+                logger.info("🎙️ Transcribing chunk %d/%s...", i + 1, total or "?")
+                res = await self._transcribe_file(chunk_path)
+            completed += 1
+            if progress_callback:
+                await progress_callback(completed, max(total or 0, completed))
+            return i, res
         
-        return header + pcm_data
+        tasks: list[asyncio.Task] = []
+        paths: list[str] = []
+        starts: list[float] | None = None
+        try:
+            if isinstance(chunks, list):
+                paths = chunks
+                tasks = [asyncio.create_task(run(i, path)) for i, path in enumerate(chunks)]
+            else:
+                starts = []
+                async for path, start in chunks:
+                    paths.append(path)
+                    starts.append(start)
+                    tasks.append(asyncio.create_task(run(len(tasks), path)))
+                    # Don't keep feeding chunks once one has already failed
+                    for task in tasks:
+                        if task.done() and task.result()[1].get("error"):
+                            return task.result()[1]
+            
+            results: list[dict[str, Any]] = [{}] * len(tasks)
+            for next_done in asyncio.as_completed(tasks):
+                i, res = await next_done
+                if res.get("error"):
+                    return res
+                results[i] = res  # indexed, so chunk order is preserved
+        finally:
+            # Abort outstanding chunks (early error or exception)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if not isinstance(chunks, list):
+                await chunks.aclose()
+            
+            # Cleanup temp chunks (never the source file)
+            await self._remove_files([p for p in paths if p != source_path])
+        
+        return {
+            "text": TranscriptionMerger.merge_text(results),
+            "segments": TranscriptionMerger.merge_segments(results, chunk_starts=starts),
+            "language": results[0].get("language", "unknown"),
+            "provider": provider,
+        }
+
+    @staticmethod
+    def _unlink_all(paths: list[str]) -> None:
+        for path in paths:
+            try:
+                Path(path).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    async def _remove_files(self, paths: list[str]) -> None:
+        """Delete temp files in one worker-thread hop; missing files are ignored."""
+        if paths:
+            await asyncio.to_thread(self._unlink_all, paths)
 
     async def _get_audio_duration(self, wav_path: str) -> float:
         """Get duration of audio file in seconds using ffprobe."""
-        import asyncio
-        import json
-        
+        # Only the duration, as bare text: no JSON to build or parse
         cmd = [
-            "ffprobe", "-v", "quiet",
-            "-print_format", "json",
-            "-show_format", wav_path
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=nw=1:nk=1", wav_path
         ]
         
         process = await asyncio.create_subprocess_exec(
@@ -73,58 +196,88 @@ class CloudTranscriberBase(ABC):
         stdout, _ = await process.communicate()
         
         if process.returncode == 0:
-            data = json.loads(stdout)
-            return float(data["format"]["duration"])
+            try:
+                return float(stdout.strip())
+            except ValueError:  # "N/A" for streams without a duration
+                pass
         return 0.0
 
-    async def _chunk_audio(self, input_wav: str, chunk_duration: int = 600, overlap: int = 10) -> list[str]:
+    @staticmethod
+    def _chunk_count(duration: float, chunk_duration: int = 600) -> int:
+        """Number of chunks _chunk_audio will produce for `duration` seconds."""
+        if duration <= chunk_duration:
+            return 1
+        return math.ceil(duration / chunk_duration)
+
+    async def _chunk_audio(
+        self,
+        input_wav: str,
+        chunk_duration: int = 600,
+        duration: float | None = None,
+    ) -> AsyncIterator[tuple[str, float]]:
         """
-        Chunk audio file into segments with overlap using FFmpeg.
-        Returns list of paths to chunk files.
+        Split audio file into fixed-length segments with a single FFmpeg pass
+        (segment muxer, stream copy), yielding (chunk path, start seconds) as
+        soon as FFmpeg has finished writing each chunk (read from the CSV
+        -segment_list on stdout: name,start,end).
+        Chunks are back to back (the segment muxer cannot overlap them), so a
+        word spoken across a boundary may be split between two chunks.
+        Pass `duration` when already known to skip the ffprobe call.
         """
-        from pathlib import Path
+        if duration is None:
+            duration = await self._get_audio_duration(input_wav)
+        if duration <= chunk_duration:
+            yield input_wav, 0.0
+            return
         
-        duration = await self._get_audio_duration(input_wav)
-        if duration <= chunk_duration + overlap:
-            return [input_wav]
-            
-        chunks = []
-        start_time = 0
-        chunk_idx = 0
+        input_path = Path(input_wav)
+        # Prefix with the input name so concurrent jobs sharing a dir don't collide
+        prefix = f"{input_path.stem}_chunk_"
+        pattern = input_path.parent / f"{prefix}%03d.wav"
         
-        temp_dir = Path(os.path.dirname(input_wav))
+        cmd = [
+            "ffmpeg", "-y", "-nostdin", "-v", "error",
+            "-i", input_wav,
+            "-f", "segment",
+            "-segment_time", str(chunk_duration),
+            "-segment_list", "pipe:1",
+            "-segment_list_type", "csv",
+            "-reset_timestamps", "1",
+            "-c", "copy",
+            str(pattern)
+        ]
         
-        while start_time < duration:
-            output_path = str(temp_dir / f"chunk_{chunk_idx}.wav")
-            
-            # Extract chunk with overlap
-            # cmd: ffmpeg -ss [start] -t [duration+overlap] -i [input] [output]
-            cmd = [
-                "ffmpeg", "-y",
-                "-ss", str(start_time),
-                "-t", str(chunk_duration + overlap),
-                "-i", input_wav,
-                "-acodec", "copy",
-                output_path
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            await process.communicate()
-            
-            if os.path.exists(output_path):
-                chunks.append(output_path)
-            
-            start_time += chunk_duration
-            chunk_idx += 1
-            
-            if start_time + overlap >= duration:
-                break
-                
-        return chunks
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        yielded = set()
+        try:
+            async for line in process.stdout:
+                # start/end are the last two fields, whatever the chunk name holds
+                fields = line.decode().strip().rsplit(",", 2)
+                if len(fields) == 3:
+                    path = str(input_path.parent / os.path.basename(fields[0]))
+                    yielded.add(path)
+                    yield path, float(fields[1])
+            await process.wait()
+            if process.returncode != 0:
+                # Chunks already sent would otherwise merge into a truncated transcript
+                raise RuntimeError(f"FFmpeg chunking failed (exit code {process.returncode})")
+            if not yielded:
+                yield input_wav, 0.0
+        finally:
+            if process.returncode is None:
+                # Consumer stopped early (chunk error): stop FFmpeg
+                process.kill()
+                await process.wait()
+            if process.returncode != 0:
+                # Drop chunks that were written but never handed out
+                leftovers = [
+                    str(p) for p in input_path.parent.glob(f"{prefix}*.wav") if str(p) not in yielded
+                ]
+                await self._remove_files(leftovers)
 
 
 class GroqTranscriber(CloudTranscriberBase):
@@ -134,10 +287,11 @@ class GroqTranscriber(CloudTranscriberBase):
     Groq offers very fast Whisper inference with a generous free tier.
     """
     
-    def __init__(self, api_key: str, model: str = "whisper-large-v3"):
+    def __init__(self, api_key: str, model: str = "whisper-large-v3", rpm: int = 0):
         self.api_key = api_key
         self.model = model
         self._client = None
+        self._limiter = RateLimiter(rpm) if rpm > 0 else None
         
     async def _get_client(self):
         """Get or create Groq client."""
@@ -152,7 +306,7 @@ class GroqTranscriber(CloudTranscriberBase):
             await self._get_client()
             return True
         except Exception as e:
-            print(f"⚠️ Groq not available: {e}")
+            logger.warning("⚠️ Groq not available: %s", e)
             return False
     
     async def transcribe(self, audio_data: Union[bytes, str], progress_callback: Any = None) -> dict[str, Any]:
@@ -166,15 +320,13 @@ class GroqTranscriber(CloudTranscriberBase):
             if isinstance(audio_data, str):
                 temp_path = audio_data
             else:
-                # 1. Convert to WAV
-                wav_data = self._pcm_to_wav(audio_data)
+                # Small clips (the common case) are uploaded straight from memory
+                wav_size = WAV_HEADER_SIZE + len(audio_data)
+                if wav_size <= 25 * 1024 * 1024 and len(audio_data) / PCM_BYTES_PER_SECOND <= 900:
+                    return await self._transcribe_bytes(self._pcm_to_wav(audio_data))
                 
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                    temp_file.write(wav_data)
-                    temp_path = temp_file.name
-                    should_cleanup = True
-            
-            try:
+                temp_path = await asyncio.to_thread(self._write_wav_tempfile, audio_data)
+                should_cleanup = True
             
             try:
                 size_mb = os.path.getsize(temp_path) / (1024 * 1024)
@@ -182,66 +334,45 @@ class GroqTranscriber(CloudTranscriberBase):
                 
                 # Chunk if size > 25MB or duration > 15m (900s)
                 if size_mb > 25 or duration > 900:
-                    print(f"📦 Audio is large ({size_mb:.1f}MB, {duration:.1f}s). Enabling chunking...")
-                    chunks = await self._chunk_audio(temp_path, chunk_duration=600, overlap=10)
-                    chunk_results = []
-                    
-                    for i, chunk_path in enumerate(chunks):
-                        if progress_callback:
-                            await progress_callback(i + 1, len(chunks))
-                        print(f"🎙️ Transcribing chunk {i+1}/{len(chunks)}...")
-                        with open(chunk_path, "rb") as f:
-                            chunk_data = f.read()
-                        
-                        # Note: _transcribe_single expects PCM bytes if we are calling it like this,
-                        # but it's easier to just call the API directly for chunks.
-                        res = await self._transcribe_file(chunk_path)
-                        if res.get("error"):
-                            return res
-                        chunk_results.append(res)
-                        
-                        # Cleanup temp chunk if it's not the original
-                        if chunk_path != temp_path:
-                            try:
-                                os.remove(chunk_path)
-                            except Exception:
-                                pass
-                    
-                    # Merge results
-                    from services.transcription_merger import TranscriptionMerger
-                    merged_segments = TranscriptionMerger.merge_segments(chunk_results)
-                    full_text = TranscriptionMerger.merge_text(chunk_results)
-                    
-                    return {
-                        "text": full_text,
-                        "segments": merged_segments,
-                        "language": chunk_results[0].get("language", "unknown"),
-                        "provider": "groq",
-                    }
+                    logger.info("📦 Audio is large (%.1fMB, %.1fs). Enabling chunking...", size_mb, duration)
+                    chunks = self._chunk_audio(temp_path, chunk_duration=600, duration=duration)
+                    return await self._transcribe_chunks_parallel(
+                        chunks, temp_path, "groq", progress_callback=progress_callback,
+                        total=self._chunk_count(duration, chunk_duration=600),
+                    )
                 else:
                     # Single file transcription
                     return await self._transcribe_file(temp_path)
                     
             finally:
-                if os.path.exists(temp_path):
-                    try:
-                        os.remove(temp_path)
-                    except Exception:
-                        pass
+                # Only our own temp file; a caller's path stays (a fallback provider may retry it)
+                if should_cleanup:
+                    await self._remove_files([temp_path])
                     
         except Exception as e:
-            print(f"❌ Groq transcription error: {e}")
+            logger.error("❌ Groq transcription error: %s", e)
             return {"error": str(e), "text": "", "provider": "groq"}
 
     async def _transcribe_file(self, wav_path: str) -> dict[str, Any]:
-        """Low-level API call for a single file."""
+        """Low-level API call for a single file (read off the event loop)."""
+        wav_data = await asyncio.to_thread(Path(wav_path).read_bytes)
+        return await self._transcribe_bytes(wav_data, filename=os.path.basename(wav_path))
+
+    async def _transcribe_bytes(self, wav_data: bytes, filename: str = "audio.wav") -> dict[str, Any]:
+        """Low-level API call for an in-memory WAV (no temp file)."""
+        buffer = io.BytesIO(wav_data)
+        buffer.name = filename  # SDK infers the upload filename/type from this
+        return await self._transcribe_upload(buffer)
+
+    async def _transcribe_upload(self, audio_file: BinaryIO) -> dict[str, Any]:
         client = await self._get_client()
-        with open(wav_path, "rb") as audio_file:
-            transcription = await client.audio.transcriptions.create(
-                file=audio_file,
-                model=self.model,
-                response_format="verbose_json",
-            )
+        if self._limiter:
+            await self._limiter.acquire()
+        transcription = await client.audio.transcriptions.create(
+            file=audio_file,
+            model=self.model,
+            response_format="verbose_json",
+        )
         
         segments = []
         if hasattr(transcription, 'segments') and transcription.segments:
@@ -265,10 +396,11 @@ class OpenAITranscriber(CloudTranscriberBase):
     Transcription using OpenAI Whisper API.
     """
     
-    def __init__(self, api_key: str, model: str = "whisper-1"):
+    def __init__(self, api_key: str, model: str = "whisper-1", rpm: int = 0):
         self.api_key = api_key
         self.model = model
         self._client = None
+        self._limiter = RateLimiter(rpm) if rpm > 0 else None
         
     async def _get_client(self):
         """Get or create OpenAI client."""
@@ -283,7 +415,7 @@ class OpenAITranscriber(CloudTranscriberBase):
             await self._get_client()
             return True
         except Exception as e:
-            print(f"⚠️ OpenAI not available: {e}")
+            logger.warning("⚠️ OpenAI not available: %s", e)
             return False
     
     async def transcribe(self, audio_data: Union[bytes, str], progress_callback: Any = None) -> dict[str, Any]:
@@ -297,70 +429,55 @@ class OpenAITranscriber(CloudTranscriberBase):
             if isinstance(audio_data, str):
                 temp_path = audio_data
             else:
-                wav_data = self._pcm_to_wav(audio_data)
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                    temp_file.write(wav_data)
-                    temp_path = temp_file.name
-                    should_cleanup = True
-            
-            try:
+                wav_size = WAV_HEADER_SIZE + len(audio_data)
+                if wav_size <= 25 * 1024 * 1024 and len(audio_data) / PCM_BYTES_PER_SECOND <= 900:
+                    return await self._transcribe_bytes(self._pcm_to_wav(audio_data))
+                temp_path = await asyncio.to_thread(self._write_wav_tempfile, audio_data)
+                should_cleanup = True
             
             try:
                 size_mb = os.path.getsize(temp_path) / (1024 * 1024)
                 duration = await self._get_audio_duration(temp_path)
                 
                 if size_mb > 25 or duration > 900:
-                    print(f"📦 Audio is large ({size_mb:.1f}MB, {duration:.1f}s). Enabling chunking...")
-                    chunks = await self._chunk_audio(temp_path, chunk_duration=600, overlap=10)
-                    chunk_results = []
-                    
-                    for i, chunk_path in enumerate(chunks):
-                        if progress_callback:
-                            await progress_callback(i + 1, len(chunks))
-                        print(f"🎙️ Transcribing chunk {i+1}/{len(chunks)}...")
-                        res = await self._transcribe_file(chunk_path)
-                        if res.get("error"):
-                            return res
-                        chunk_results.append(res)
-                        if chunk_path != temp_path:
-                            try:
-                                os.remove(chunk_path)
-                            except Exception:
-                                pass
-                    
-                    from services.transcription_merger import TranscriptionMerger
-                    merged_segments = TranscriptionMerger.merge_segments(chunk_results)
-                    full_text = TranscriptionMerger.merge_text(chunk_results)
-                    
-                    return {
-                        "text": full_text,
-                        "segments": merged_segments,
-                        "language": chunk_results[0].get("language", "unknown"),
-                        "provider": "openai",
-                    }
+                    logger.info("📦 Audio is large (%.1fMB, %.1fs). Enabling chunking...", size_mb, duration)
+                    chunks = self._chunk_audio(temp_path, chunk_duration=600, duration=duration)
+                    return await self._transcribe_chunks_parallel(
+                        chunks, temp_path, "openai", progress_callback=progress_callback,
+                        total=self._chunk_count(duration, chunk_duration=600),
+                    )
                 else:
                     return await self._transcribe_file(temp_path)
                     
             finally:
-                if os.path.exists(temp_path):
-                    try:
-                        os.remove(temp_path)
-                    except Exception:
-                        pass
+                # Only our own temp file; a caller's path stays (a fallback provider may retry it)
+                if should_cleanup:
+                    await self._remove_files([temp_path])
                     
         except Exception as e:
-            print(f"❌ OpenAI transcription error: {e}")
+            logger.error("❌ OpenAI transcription error: %s", e)
             return {"error": str(e), "text": "", "provider": "openai"}
 
     async def _transcribe_file(self, wav_path: str) -> dict[str, Any]:
-        """Low-level API call for a single file."""
+        """Low-level API call for a single file (read off the event loop)."""
+        wav_data = await asyncio.to_thread(Path(wav_path).read_bytes)
+        return await self._transcribe_bytes(wav_data, filename=os.path.basename(wav_path))
+
+    async def _transcribe_bytes(self, wav_data: bytes, filename: str = "audio.wav") -> dict[str, Any]:
+        """Low-level API call for an in-memory WAV (no temp file)."""
+        buffer = io.BytesIO(wav_data)
+        buffer.name = filename  # SDK infers the upload filename/type from this
+        return await self._transcribe_upload(buffer)
+
+    async def _transcribe_upload(self, audio_file: BinaryIO) -> dict[str, Any]:
         client = await self._get_client()
-        with open(wav_path, "rb") as audio_file:
-            transcription = await client.audio.transcriptions.create(
-                file=audio_file,
-                model=self.model,
-                response_format="verbose_json",
-            )
+        if self._limiter:
+            await self._limiter.acquire()
+        transcription = await client.audio.transcriptions.create(
+            file=audio_file,
+            model=self.model,
+            response_format="verbose_json",
+        )
         
         segments = []
         if hasattr(transcription, 'segments') and transcription.segments:
@@ -379,47 +496,120 @@ class OpenAITranscriber(CloudTranscriberBase):
         }
 
 
+class RateLimiter:
+    """
+    Client-side leaky-bucket limiter: at most `max_rate` requests per
+    `time_period` seconds, so parallel chunks wait instead of hitting 429s.
+    Check-and-take never awaits, so it is atomic on the event loop.
+    """
+    
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        self.max_rate = max_rate
+        self._leak_rate = max_rate / time_period
+        self._level = 0.0
+        self._last = time.monotonic()
+    
+    def _leak(self) -> None:
+        now = time.monotonic()
+        self._level = max(0.0, self._level - (now - self._last) * self._leak_rate)
+        self._last = now
+    
+    async def acquire(self) -> None:
+        """Wait until a request slot is free, then take it."""
+        while True:
+            self._leak()
+            if self._level + 1 <= self.max_rate:
+                self._level += 1
+                return
+            await asyncio.sleep((self._level + 1 - self.max_rate) / self._leak_rate)
+
+
 class KeyPool:
     """
     Round-robin key rotation for API rate limit distribution.
-    Thread-safe for concurrent requests.
+    Lock-free: advancing the cycle never awaits, so it is atomic on the event loop.
     """
     
     def __init__(self, keys: list[str]):
         self._keys = keys
-        self._index = 0
-        self._lock = None  # Will be created on first use
+        self._cycle = itertools.cycle(keys)
     
-    def _get_lock(self):
-        if self._lock is None:
-            import asyncio
-            self._lock = asyncio.Lock()
-        return self._lock
-    
-    async def get_next_key(self) -> str | None:
+    def get_next_key(self) -> str | None:
         """Get next key in rotation. Returns None if no keys available."""
-        if not self._keys:
-            return None
-        
-        async with self._get_lock():
-            key = self._keys[self._index]
-            self._index = (self._index + 1) % len(self._keys)
-            return key
+        return next(self._cycle) if self._keys else None
     
     @property
     def size(self) -> int:
         return len(self._keys)
 
 
+def _words_to_segments(words: list[dict[str, Any]], max_span: float = 3.0) -> list[dict[str, Any]]:
+    """
+    Group Deepgram words into ~max_span second segments.
+    Break points are found with np.searchsorted on the (sorted) word end times,
+    so Python only loops once per segment rather than once per word.
+    """
+    n = len(words)
+    if not n:
+        return []
+    ends = np.fromiter((w["end"] for w in words), dtype=np.float64, count=n)
+    texts = [w["word"] for w in words]
+    
+    segments = []
+    prev = 0
+    seg_start = float(words[0]["start"])
+    while prev < n:
+        # First word (at or after prev) ending max_span past the segment start
+        j = max(int(np.searchsorted(ends, seg_start + max_span)), prev)
+        # Nudge across float rounding so the test matches `end - start >= max_span`
+        while j > prev and ends[j - 1] - seg_start >= max_span:
+            j -= 1
+        while j < n and ends[j] - seg_start < max_span:
+            j += 1
+        if j >= n:
+            j = n - 1
+        text = " ".join(texts[prev:j + 1]).strip()
+        if text:
+            segments.append({"start": seg_start, "end": float(ends[j]), "text": text})
+        seg_start = float(ends[j])
+        prev = j + 1
+    return segments
+
+
 class DeepgramTranscriber(CloudTranscriberBase):
     """
     Transcription using Deepgram Nova-2 API with key rotation.
     """
     
     DEEPGRAM_API_URL = "https://api.deepgram.com/v1/listen"
+    # Large blocks keep thread hand-offs to a few hundred even for big uploads
+    STREAM_BLOCK_SIZE = 4 * 1024 * 1024
     
     def __init__(self, key_pool: KeyPool):
         self.key_pool = key_pool
+        self._session = None
+        
+    async def _get_session(self):
+        """Get or create the shared HTTP session (keeps TLS connections warm)."""
+        if self._session is None or self._session.closed:
+            import aiohttp
+            connector = aiohttp.TCPConnector(
+                limit=max(16, self.max_concurrent_chunks),
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def prewarm(self) -> None:
+        """Import aiohttp and open the session at startup rather than on the first request."""
+        await self._get_session()
+    
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
         
     async def is_available(self) -> bool:
         """Check if Deepgram API is available (has keys)."""
@@ -436,13 +626,11 @@ class DeepgramTranscriber(CloudTranscriberBase):
             if isinstance(audio_data, str):
                 temp_path = audio_data
             else:
-                wav_data = self._pcm_to_wav(audio_data)
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                    temp_file.write(wav_data)
-                    temp_path = temp_file.name
-                    should_cleanup = True
-            
-            try:
+                wav_size = WAV_HEADER_SIZE + len(audio_data)
+                if wav_size <= 50 * 1024 * 1024 and len(audio_data) / PCM_BYTES_PER_SECOND <= 1200:
+                    return await self._transcribe_bytes(self._pcm_to_wav(audio_data))
+                temp_path = await asyncio.to_thread(self._write_wav_tempfile, audio_data)
+                should_cleanup = True
             
             try:
                 size_mb = os.path.getsize(temp_path) / (1024 * 1024)
@@ -450,62 +638,51 @@ class DeepgramTranscriber(CloudTranscriberBase):
                 
                 # Deepgram limit is much higher but for consistency we chunk similarly if needed
                 if size_mb > 50 or duration > 1200:
-                    print(f"📦 Audio is very large ({size_mb:.1f}MB, {duration:.1f}s). Enabling chunking for stability...")
-                    chunks = await self._chunk_audio(temp_path, chunk_duration=600, overlap=10)
-                    chunk_results = []
-                    
-                    for i, chunk_path in enumerate(chunks):
-                        if progress_callback:
-                            await progress_callback(i + 1, len(chunks))
-                        print(f"🎙️ Transcribing chunk {i+1}/{len(chunks)}...")
-                        res = await self._transcribe_file(chunk_path)
-                        if res.get("error"):
-                            return res
-                        chunk_results.append(res)
-                        if chunk_path != temp_path:
-                            try:
-                                os.remove(chunk_path)
-                            except Exception:
-                                pass
-                    
-                    from services.transcription_merger import TranscriptionMerger
-                    merged_segments = TranscriptionMerger.merge_segments(chunk_results)
-                    full_text = TranscriptionMerger.merge_text(chunk_results)
-                    
-                    return {
-                        "text": full_text,
-                        "segments": merged_segments,
-                        "language": chunk_results[0].get("language", "unknown"),
-                        "provider": "deepgram",
-                    }
+                    logger.info("📦 Audio is very large (%.1fMB, %.1fs). Enabling chunking for stability...", size_mb, duration)
+                    chunks = self._chunk_audio(temp_path, chunk_duration=600, duration=duration)
+                    return await self._transcribe_chunks_parallel(
+                        chunks, temp_path, "deepgram", progress_callback=progress_callback,
+                        total=self._chunk_count(duration, chunk_duration=600),
+                    )
                 else:
                     return await self._transcribe_file(temp_path)
                     
             finally:
-                if os.path.exists(temp_path):
-                    try:
-                        os.remove(temp_path)
-                    except Exception:
-                        pass
+                # Only our own temp file; a caller's path stays (a fallback provider may retry it)
+                if should_cleanup:
+                    await self._remove_files([temp_path])
                     
         except Exception as e:
-            print(f"Deepgram transcription error: {e}")
+            logger.error("Deepgram transcription error: %s", e)
             return {"error": str(e), "text": "", "provider": "deepgram"}
 
     async def _transcribe_file(self, wav_path: str) -> dict[str, Any]:
-        """Low-level API call for a single file."""
-        import aiohttp
-        api_key = await self.key_pool.get_next_key()
+        """Low-level API call for a single file, streamed in blocks."""
+        audio_file = await asyncio.to_thread(open, wav_path, "rb")
+        try:
+            size = os.fstat(audio_file.fileno()).st_size
+
+            async def stream():
+                while block := await asyncio.to_thread(audio_file.read, self.STREAM_BLOCK_SIZE):
+                    yield block
+
+            return await self._transcribe_bytes(stream(), content_length=size)
+        finally:
+            audio_file.close()
+
+    async def _transcribe_bytes(self, wav_data: Any, content_length: int | None = None) -> dict[str, Any]:
+        """Low-level API call; wav_data is a WAV blob or an async iterator of blocks."""
+        api_key = self.key_pool.get_next_key()
         if not api_key:
             return {"error": "No Deepgram keys available", "text": "", "provider": "deepgram"}
         
-        with open(wav_path, "rb") as audio_file:
-            wav_data = audio_file.read()
-            
         headers = {
             "Authorization": f"Token {api_key}",
             "Content-Type": "audio/wav",
         }
+        if content_length is not None:
+            # Known length, so the streamed body isn't sent chunked
+            headers["Content-Length"] = str(content_length)
         
         params = {
             "model": "nova-2",
@@ -514,18 +691,18 @@ class DeepgramTranscriber(CloudTranscriberBase):
             "smart_format": "true",
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.DEEPGRAM_API_URL,
-                headers=headers,
-                params=params,
-                data=wav_data,
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    return {"error": f"HTTP {response.status}: {error_text}", "text": "", "provider": "deepgram"}
-                
-                result = await response.json()
+        session = await self._get_session()
+        async with session.post(
+            self.DEEPGRAM_API_URL,
+            headers=headers,
+            params=params,
+            data=wav_data,
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                return {"error": f"HTTP {response.status}: {error_text}", "text": "", "provider": "deepgram"}
+            
+            result = await response.json()
         
         # Parse response
         transcript = ""
@@ -535,20 +712,7 @@ class DeepgramTranscriber(CloudTranscriberBase):
             if "alternatives" in channel and channel["alternatives"]:
                 alternative = channel["alternatives"][0]
                 transcript = alternative.get("transcript", "")
-                if "words" in alternative:
-                    words = alternative["words"]
-                    if words:
-                        current_segment = {"start": words[0]["start"], "end": 0, "text": ""}
-                        for word in words:
-                            current_segment["end"] = word["end"]
-                            current_segment["text"] += word["word"] + " "
-                            if word["end"] - current_segment["start"] >= 3.0:
-                                current_segment["text"] = current_segment["text"].strip()
-                                segments.append(current_segment)
-                                current_segment = {"start": word["end"], "end": 0, "text": ""}
-                        if current_segment["text"].strip():
-                            current_segment["text"] = current_segment["text"].strip()
-                            segments.append(current_segment)
+                segments = _words_to_segments(alternative.get("words") or [])
         
         return {
             "text": transcript.strip(),
@@ -6,16 +6,24 @@ Implements the Privacy-First logic:
 - allow_collection=False: Delete from jobs, keep training_datasets
 """
 
+import asyncio
+import time
 from datetime import datetime
 from typing import Any, Dict, Optional
 import json
 
 from supabase import create_client, Client
-from config import settings
+from config import get_settings
+
+settings = get_settings()
+
+# Seconds a fetched job row is served from memory before re-querying Supabase
+JOB_CACHE_TTL = 2.0
 
 class DatabaseService:
     def __init__(self):
         self.client: Optional[Client] = None
+        self._job_cache: Dict[str, tuple[float, Dict[str, Any]]] = {}
         if settings.supabase_url and settings.supabase_key:
             try:
                 self.client = create_client(settings.supabase_url, settings.supabase_key)
@@ -55,48 +63,65 @@ class DatabaseService:
                 "updated_at": datetime.now().isoformat()
             }
 
-            # Upsert into jobs table
-            self.client.table("jobs").upsert(db_data).execute()
+            if job_data["status"] != "done":
+                await asyncio.to_thread(self._upsert_job, db_data)
+                self._cache_job(db_data["id"], db_data)
+                return
             
-            # If job is DONE, also save to training_datasets (Anonymized)
-            if job_data["status"] == "done":
-                self._save_training_data(job_data)
+            # Job is DONE: upsert the job and save training data (Anonymized) concurrently
+            job_result, training_result = await asyncio.gather(
+                asyncio.to_thread(self._upsert_job, db_data),
+                asyncio.to_thread(self._save_training_data, job_data),
+                return_exceptions=True,
+            )
+            if isinstance(job_result, Exception):
+                raise job_result
+            self._cache_job(db_data["id"], db_data)
+            if isinstance(training_result, Exception):
+                # training_datasets references jobs.id: retry once the job row exists
+                try:
+                    await asyncio.to_thread(self._save_training_data, job_data)
+                except Exception as e:
+                    print(f"⚠️ Failed to save training data: {e}")
 
         except Exception as e:
             print(f"⚠️ Failed to save job to Supabase: {e}")
 
+    def _cache_job(self, job_id: str, data: Dict[str, Any], now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        if len(self._job_cache) >= settings.max_jobs_in_memory:
+            # Drop expired rows so the cache stays bounded
+            self._job_cache = {
+                k: v for k, v in self._job_cache.items() if now - v[0] < JOB_CACHE_TTL
+            }
+        self._job_cache[job_id] = (now, data)
+
+    def _upsert_job(self, db_data: Dict[str, Any]) -> None:
+        self.client.table("jobs").upsert(db_data).execute()
+
     def _save_training_data(self, job_data: Dict[str, Any]) -> None:
         """
-        Save anonymized data to training_datasets.
+        Save anonymized data to training_datasets (blocking; run in a thread).
+        Idempotent: one training record per job via unique source_job_id.
         """
-        try:
-            training_data = {
-                "source_job_id": job_data["id"],
-                "source_lang": job_data["source_lang"],
-                "target_lang": job_data["target_lang"],
-                # We save the full segments JSON which contains text + timings
-                "segments": job_data["segments"],
-                # Calculate duration from last segment
-                "duration_seconds": self._calculate_duration(job_data["segments"]),
-                # Extract full text for easier searching
-                "transcript_text": " ".join([s.get("text", "") for s in job_data["segments"]])
-            }
-            
-            # Insert (not upsert, as we might have multiple segments from same job potentially?? 
-            # Actually for now 1 job = 1 training record is fine)
-            # Use upsert based on source_job_id if possible, or just insert.
-            # Since source_job_id is not PK, let's query first or just use insert which might duplicate if run multiple times.
-            # To be safe, let's treat it as idempotent: delete old by job_id then insert?
-            # Or just rely on job_id reference.
-            
-            # Simple approach: Check if exists
-            existing = self.client.table("training_datasets").select("id").eq("source_job_id", job_data["id"]).execute()
-            if not existing.data:
-                self.client.table("training_datasets").insert(training_data).execute()
-                print(f"🤖 Saved training data for job {job_data['id']}")
-                
-        except Exception as e:
-            print(f"⚠️ Failed to save training data: {e}")
+        segments = job_data["segments"]
+        training_data = {
+            "source_job_id": job_data["id"],
+            "source_lang": job_data["source_lang"],
+            "target_lang": job_data["target_lang"],
+            # We save the full segments JSON which contains text + timings
+            "segments": segments,
+            # Duration from last segment (O(1), no extra pass)
+            "duration_seconds": self._calculate_duration(segments),
+            # Extract full text for easier searching (single pass; join of a list avoids a hidden second walk)
+            "transcript_text": " ".join([s.get("text", "") for s in segments])
+        }
+        
+        # Single round-trip: insert, or do nothing if this job already has a record
+        self.client.table("training_datasets").upsert(
+            training_data, on_conflict="source_job_id", ignore_duplicates=True
+        ).execute()
+        print(f"🤖 Saved training data for job {job_data['id']}")
 
     def _calculate_duration(self, segments: list) -> float:
         if not segments:
@@ -115,9 +140,12 @@ class DatabaseService:
         """
         if not self.is_available():
             return
-            
+        
+        self._job_cache.pop(job_id, None)
         try:
-            self.client.table("jobs").delete().eq("id", job_id).execute()
+            await asyncio.to_thread(
+                lambda: self.client.table("jobs").delete().eq("id", job_id).execute()
+            )
             print(f"🗑️ Deleted job {job_id} from Cloud (User Revoked)")
         except Exception as e:
             print(f"⚠️ Failed to delete job from Supabase: {e}")
@@ -125,14 +153,25 @@ class DatabaseService:
     async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve job from Supabase (for persistent access).
+        Rows are cached for JOB_CACHE_TTL seconds so status polling
+        doesn't cost a round-trip per request.
         """
         if not self.is_available():
             return None
+        
+        now = time.monotonic()
+        entry = self._job_cache.get(job_id)
+        if entry and now - entry[0] < JOB_CACHE_TTL:
+            return entry[1]
             
         try:
-            response = self.client.table("jobs").select("*").eq("id", job_id).execute()
+            response = await asyncio.to_thread(
+                lambda: self.client.table("jobs").select("*").eq("id", job_id).execute()
+            )
             if response.data:
+                self._cache_job(job_id, response.data[0], now)
                 return response.data[0]
+            self._job_cache.pop(job_id, None)
             return None
         except Exception as e:
             print(f"⚠️ Failed to fetch job from Supabase: {e}")
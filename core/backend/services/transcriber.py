@@ -4,20 +4,182 @@ Handles speech-to-text with Faster Whisper (GPU/CPU).
 """
 
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
 from typing import Any, Union
 import numpy as np
 
-# CPU-bound transcription pool
-_executor = ThreadPoolExecutor(max_workers=2)
+# Single model worker: concurrent transcribe() calls on one WhisperModel only
+# contend on its lock; CTranslate2 already parallelizes inside each call
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+
+
+# TensorRT engine cache for the Silero VAD model
+TRT_ENGINE_CACHE = Path(tempfile.gettempdir()) / "bypass_subtitles" / "trt_vad"
+
+
+def _enable_gpu_vad() -> bool:
+    """
+    Move faster-whisper's Silero VAD session onto CUDA when onnxruntime-gpu
+    is installed (TensorRT first, when its provider is present). The stock
+    session is single-threaded CPU, which becomes the serial bottleneck once
+    decoding runs on the GPU.
+    """
+    try:
+        import onnxruntime
+        from faster_whisper import vad
+        from faster_whisper.utils import get_assets_path
+    except ImportError:
+        return False
+    if "CUDAExecutionProvider" not in onnxruntime.get_available_providers():
+        return False
+    
+    # Expects the faster-whisper >= 1.2 layout: bundled silero_vad*.onnx and
+    # a cached SileroVADModel exposing its onnxruntime `session`
+    model_path = next(Path(get_assets_path()).glob("silero_vad*.onnx"), None)
+    if model_path is None:
+        print("⚠️ GPU VAD skipped: no silero_vad*.onnx in faster-whisper assets")
+        return False
+    providers: list[Any] = ["CUDAExecutionProvider", "CPUExecutionProvider"]
+    if "TensorrtExecutionProvider" in onnxruntime.get_available_providers():
+        # Compiled engine is cached on disk, so only the first start pays the build
+        TRT_ENGINE_CACHE.mkdir(parents=True, exist_ok=True)
+        providers.insert(0, ("TensorrtExecutionProvider", {
+            "trt_engine_cache_enable": True,
+            "trt_engine_cache_path": str(TRT_ENGINE_CACHE),
+        }))
+    try:
+        model = vad.get_vad_model()  # cached singleton used by get_speech_timestamps
+        if not hasattr(model, "session"):
+            print("⚠️ GPU VAD skipped: unrecognised faster-whisper VAD model layout")
+            return False
+        opts = onnxruntime.SessionOptions()
+        opts.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.log_severity_level = 4
+        model.session = onnxruntime.InferenceSession(
+            str(model_path),
+            providers=providers,
+            sess_options=opts,
+        )
+        return True
+    except Exception as e:
+        print(f"⚠️ GPU VAD not available, keeping CPU VAD: {e}")
+        return False
+
+
+def _run_transcription(
+    model: Any,
+    pipeline: Any,
+    audio_input: Union[bytes, str],
+    beam_size: int,
+    batch_size: int,
+) -> dict[str, Any]:
+    """Blocking transcription; returns plain data so it can cross process boundaries."""
+    if isinstance(audio_input, str):
+        # Pass path directly
+        audio_for_model = audio_input
+    else:
+        # int16 view over the bytes, scaled into one float32 buffer (no temporaries)
+        audio_i16 = np.frombuffer(audio_input, dtype=np.int16)
+        audio_for_model = np.empty(audio_i16.shape, dtype=np.float32)
+        np.multiply(audio_i16, np.float32(1.0 / 32768.0), out=audio_for_model)
+    
+    if pipeline is not None:
+        segments, info = pipeline.transcribe(
+            audio_for_model,
+            beam_size=beam_size,
+            language=None,
+            vad_filter=True,
+            batch_size=batch_size,
+        )
+    else:
+        segments, info = model.transcribe(
+            audio_for_model,
+            beam_size=beam_size,
+            language=None,
+            vad_filter=True,
+        )
+    
+    segments_list = []
+    full_text = []
+    
+    for segment in segments:
+        segments_list.append({
+            "start": segment.start,
+            "end": segment.end,
+            "text": segment.text.strip(),
+        })
+        full_text.append(segment.text.strip())
+    
+    return {
+        "text": " ".join(full_text),
+        "segments": segments_list,
+        "language": info.language,
+        "language_probability": info.language_probability,
+        "provider": "local",
+    }
+
+
+# Per-process model for the optional CPU process pool (see TranscriberService.cpu_workers)
+_worker_model: Any = None
+_worker_pipeline: Any = None
+
+
+def _init_worker(model_size: str, compute_type: str, cpu_threads: int, batch_size: int) -> None:
+    global _worker_model, _worker_pipeline
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(
+        model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads
+    )
+    if batch_size > 0:
+        from faster_whisper import BatchedInferencePipeline
+        _worker_pipeline = BatchedInferencePipeline(_worker_model)
+
+
+def _worker_ping() -> bool:
+    return _worker_model is not None
+
+
+def _worker_transcribe(audio_input: Union[bytes, str], beam_size: int, batch_size: int) -> dict[str, Any]:
+    return _run_transcription(_worker_model, _worker_pipeline, audio_input, beam_size, batch_size)
 
 
 class TranscriberService:
     """Faster-whisper wrapper with GPU support and CPU fallback."""
     
-    def __init__(self, model_size: str = "small", device: str = "auto") -> None:
+    def __init__(
+        self,
+        model_size: str = "small",
+        device: str = "auto",
+        compute_type: str = "auto",
+        batch_size: int = 0,
+        beam_size: int = 1,
+        cpu_workers: int = 0,
+        num_workers: int = 1,
+    ) -> None:
         self.model_size = model_size
+        # "auto" lets CTranslate2 pick the fastest type the device supports
+        self.compute_type = compute_type
+        # > 0: run VAD segments through the encoder in batches of this size
+        self.batch_size = batch_size
+        # 1 = greedy; faster-whisper's temperature fallback re-decodes weak windows
+        self.beam_size = beam_size
+        # > 0 (CPU only): one model per worker process, so concurrent jobs
+        # don't share a GIL for pre/post-processing
+        self.cpu_workers = cpu_workers
+        self._pool: ProcessPoolExecutor | None = None
+        # > 1: CTranslate2 keeps this many replicas/streams, so this many
+        # transcribe() calls run at once (one job's encode overlaps another's decode)
+        self.num_workers = max(1, num_workers)
+        self._executor = _executor if self.num_workers == 1 else ThreadPoolExecutor(
+            max_workers=self.num_workers, thread_name_prefix="whisper"
+        )
+        self._model_kwargs = {"num_workers": self.num_workers} if self.num_workers > 1 else {}
         self.model = None
+        self.pipeline = None
         self.is_ready = False
         self.device = device
         self.configured_device = device
@@ -26,7 +188,17 @@ class TranscriberService:
         print(f"📦 Loading Whisper model: {self.model_size} (device: {self.configured_device})")
         
         loop = asyncio.get_event_loop()
-        await loop.run_in_executor(_executor, self._load_model)
+        if self.configured_device == "cpu" and self.cpu_workers > 0:
+            await self._start_process_pool()
+            self.device = "cpu"
+            self.is_ready = True
+            print(f"✅ Model loaded in {self.cpu_workers} CPU worker processes")
+            return
+        
+        await loop.run_in_executor(self._executor, self._load_model)
+        if self.batch_size > 0:
+            from faster_whisper import BatchedInferencePipeline
+            self.pipeline = BatchedInferencePipeline(self.model)
         
         self.is_ready = True
         print(f"✅ Model loaded successfully on {self.device.upper()}")
@@ -38,16 +210,20 @@ class TranscriberService:
             # Explicit CPU
             if self.configured_device == "cpu":
                 print("🖥️ Using CPU for transcription (configured)")
-                self.model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
+                self.model = WhisperModel(
+                    self.model_size, device="cpu", compute_type=self.compute_type, **self._model_kwargs
+                )
                 self.device = "cpu"
                 return
             
             # Try GPU
             if self.configured_device in ("auto", "cuda"):
                 try:
-                    self.model = WhisperModel(self.model_size, device="cuda", compute_type="float16")
+                    self.model = self._load_cuda_model(WhisperModel)
                     self.device = "cuda"
                     print("🎮 Using GPU (CUDA) for transcription")
+                    if _enable_gpu_vad():
+                        print("🎮 Silero VAD running on CUDA")
                     return
                 except Exception as gpu_error:
                     print(f"⚠️ GPU not available: {gpu_error}")
@@ -55,7 +231,9 @@ class TranscriberService:
                     print("🖥️ Falling back to CPU...")
             
             # Fallback
-            self.model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
+            self.model = WhisperModel(
+                self.model_size, device="cpu", compute_type=self.compute_type, **self._model_kwargs
+            )
             self.device = "cpu"
             print("🖥️ Using CPU for transcription")
                 
@@ -63,49 +241,70 @@ class TranscriberService:
             print(f"❌ Failed to import faster-whisper: {e}")
             raise
     
+    async def _start_process_pool(self) -> None:
+        cpu_threads = max(1, (os.cpu_count() or 1) // self.cpu_workers)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.cpu_workers,
+            # spawn: never fork a process that already holds CTranslate2 threads
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_size, self.compute_type, cpu_threads, self.batch_size),
+        )
+        # Start every worker (and load its model) now rather than on the first job
+        loop = asyncio.get_event_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._pool, _worker_ping) for _ in range(self.cpu_workers)
+        ))
+    
+    async def close(self) -> None:
+        """Drop the model so CTranslate2 frees its (V)RAM."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._executor is not _executor:
+            self._executor.shutdown(wait=False)
+        self.pipeline = None
+        self.model = None
+        self.is_ready = False
+    
+    def _load_cuda_model(self, whisper_model: Any) -> Any:
+        """
+        Load on CUDA. With compute_type "auto", prefer int8_float16: decoding is
+        memory-bound, so int8 weights roughly halve VRAM and bandwidth.
+        GPUs without int8 support raise ValueError and get CTranslate2's own pick.
+        """
+        if self.compute_type != "auto":
+            return whisper_model(
+                self.model_size, device="cuda", compute_type=self.compute_type, **self._model_kwargs
+            )
+        try:
+            return whisper_model(
+                self.model_size, device="cuda", compute_type="int8_float16", **self._model_kwargs
+            )
+        except ValueError as e:
+            print(f"⚠️ int8_float16 not supported on this GPU ({e}), using auto")
+            return whisper_model(
+                self.model_size, device="cuda", compute_type="auto", **self._model_kwargs
+            )
+    
     async def transcribe(self, audio_input: Union[bytes, str], progress_callback: Any = None) -> dict[str, Any]:
         """Transcribe PCM 16-bit 16kHz mono audio or file path."""
-        if not self.is_ready or self.model is None:
+        if not self.is_ready or (self.model is None and self._pool is None):
             return {"error": "Model not ready", "text": ""}
         
         try:
             loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(_executor, self._transcribe_sync, audio_input)
+            if self._pool is not None:
+                return await loop.run_in_executor(
+                    self._pool, _worker_transcribe, audio_input, self.beam_size, self.batch_size
+                )
+            result = await loop.run_in_executor(self._executor, self._transcribe_sync, audio_input)
             return result
         except Exception as e:
             print(f"❌ Transcription error: {e}")
             return {"error": str(e), "text": ""}
     
     def _transcribe_sync(self, audio_input: Union[bytes, str]) -> dict[str, Any]:
-        if isinstance(audio_input, str):
-            # Pass path directly
-            audio_for_model = audio_input
-        else:
-            # Convert bytes to float32
-            audio_for_model = np.frombuffer(audio_input, dtype=np.int16).astype(np.float32) / 32768.0
-        
-        segments, info = self.model.transcribe(
-            audio_for_model,
-            beam_size=5,
-            language=None,
-            vad_filter=True,
+        return _run_transcription(
+            self.model, self.pipeline, audio_input, self.beam_size, self.batch_size
         )
-        
-        segments_list = []
-        full_text = []
-        
-        for segment in segments:
-            segments_list.append({
-                "start": segment.start,
-                "end": segment.end,
-                "text": segment.text.strip(),
-            })
-            full_text.append(segment.text.strip())
-        
-        return {
-            "text": " ".join(full_text),
-            "segments": segments_list,
-            "language": info.language,
-            "language_probability": info.language_probability,
-            "provider": "local",
-        }
@@ -3,8 +3,12 @@ Transcriber Factory
 Creates appropriate transcriber (Local, Groq, or OpenAI) based on config.
 """
 
+from collections import OrderedDict
+from pathlib import Path
 from typing import Any, Protocol, Union
-from config import TranscriptionMode, settings
+from config import TranscriptionMode, get_settings
+
+settings = get_settings()
 
 
 class Transcriber(Protocol):
@@ -13,16 +17,36 @@ class Transcriber(Protocol):
     async def transcribe(self, audio_input: Union[bytes, str], progress_callback: Any = None) -> dict[str, Any]: ...
 
 
+def _local_model() -> str:
+    """
+    Model for local Whisper: an explicit WHISPER_MODEL_PATH, else a prefetched
+    dir for the configured size (see scripts/prefetch_models.py), else the
+    size name, which faster-whisper downloads from the Hub.
+    """
+    if settings.whisper_model_path:
+        return settings.whisper_model_path
+    if settings.whisper_models_dir:
+        baked = Path(settings.whisper_models_dir) / f"faster-whisper-{settings.whisper_model_size}"
+        if baked.is_dir():
+            return str(baked)
+    return settings.whisper_model_size
+
+
 class TranscriberFactory:
-    _instance: Transcriber | None = None
-    _mode: TranscriptionMode | None = None
+    # Warm transcribers keyed by (mode, model size, device); switching back to a
+    # recent mode reuses the loaded model instead of reloading it
+    _warm: "OrderedDict[tuple, Transcriber]" = OrderedDict()
+    WARM_POOL_SIZE = 3
     
     @classmethod
-    async def create(cls) -> Transcriber:
-        mode = settings.get_effective_mode()
+    async def create(cls, mode: TranscriptionMode | None = None) -> Transcriber:
+        mode = mode or settings.effective_mode
+        key = (mode, _local_model(), settings.whisper_device)
         
-        if cls._instance is not None and cls._mode == mode:
-            return cls._instance
+        transcriber = cls._warm.get(key)
+        if transcriber is not None:
+            cls._warm.move_to_end(key)
+            return transcriber
         
         print(f"Creating transcriber with mode: {mode.value}")
         
@@ -34,32 +58,43 @@ class TranscriberFactory:
              
              if groq.is_ready and deepgram.is_ready:
                  print("✨ Enabling Rotation Mode: Groq (Primary) -> Deepgram (Fallback)")
-                 cls._instance = RotationTranscriberWrapper(primary=groq, secondary=deepgram)
+                 transcriber = RotationTranscriberWrapper(primary=groq, secondary=deepgram)
              elif groq.is_ready:
-                 cls._instance = groq
+                 transcriber = groq
              elif deepgram.is_ready:
-                 cls._instance = deepgram
+                 transcriber = deepgram
              else:
-                 cls._instance = await cls._create_local()
+                 transcriber = await cls._create_local()
                  
         elif mode == TranscriptionMode.GROQ:
-            cls._instance = await cls._create_groq()
+            transcriber = await cls._create_groq()
         elif mode == TranscriptionMode.DEEPGRAM:
-            cls._instance = await cls._create_deepgram()
+            transcriber = await cls._create_deepgram()
         elif mode == TranscriptionMode.OPENAI:
-            cls._instance = await cls._create_openai()
+            transcriber = await cls._create_openai()
         else:
-            cls._instance = await cls._create_local()
+            transcriber = await cls._create_local()
         
-        cls._mode = mode
-        return cls._instance
+        cls._warm[key] = transcriber
+        if len(cls._warm) > cls.WARM_POOL_SIZE:
+            _, evicted = cls._warm.popitem(last=False)
+            close = getattr(evicted, "close", None)
+            if close:
+                await close()  # releases model memory / HTTP sessions
+        return transcriber
     
     @classmethod
     async def _create_local(cls) -> Transcriber:
         from services.transcriber import TranscriberService
         transcriber = TranscriberService(
-            model_size=settings.whisper_model_size,
+            # A prefetched local model dir loads without touching the Hub
+            model_size=_local_model(),
             device=settings.whisper_device,
+            compute_type=settings.whisper_compute_type,
+            batch_size=settings.whisper_batch_size,
+            beam_size=settings.whisper_beam_size,
+            cpu_workers=settings.whisper_cpu_workers,
+            num_workers=settings.whisper_num_workers,
         )
         await transcriber.initialize()
         return transcriber
@@ -70,7 +105,7 @@ class TranscriberFactory:
             print("⚠️ GROQ_API_KEY not set, falling back to local")
             return await cls._create_local()
         
-        transcriber = GroqTranscriberWrapper(settings.groq_api_key, settings.groq_model)
+        transcriber = GroqTranscriberWrapper(settings.groq_api_key, settings.groq_model, settings.groq_rpm)
         await transcriber.initialize()
         return transcriber
     
@@ -80,13 +115,13 @@ class TranscriberFactory:
             print("OPENAI_API_KEY not set, falling back to local")
             return await cls._create_local()
         
-        transcriber = OpenAITranscriberWrapper(settings.openai_api_key, settings.openai_model)
+        transcriber = OpenAITranscriberWrapper(settings.openai_api_key, settings.openai_model, settings.openai_rpm)
         await transcriber.initialize()
         return transcriber
     
     @classmethod
     async def _create_deepgram(cls) -> Transcriber:
-        keys = settings.get_deepgram_keys_list()
+        keys = settings.deepgram_keys_list
         if not keys:
             print("DEEPGRAM_API_KEYS not set, falling back to local")
             return await cls._create_local()
@@ -97,15 +132,16 @@ class TranscriberFactory:
 
 
 class GroqTranscriberWrapper:
-    def __init__(self, api_key: str, model: str):
+    def __init__(self, api_key: str, model: str, rpm: int = 0):
         self.api_key = api_key
         self.model = model
+        self.rpm = rpm
         self._transcriber = None
         self.is_ready = False
     
     async def initialize(self) -> None:
         from services.cloud_transcriber import GroqTranscriber
-        self._transcriber = GroqTranscriber(api_key=self.api_key, model=self.model)
+        self._transcriber = GroqTranscriber(api_key=self.api_key, model=self.model, rpm=self.rpm)
         self.is_ready = await self._transcriber.is_available()
         print("Groq transcriber ready" if self.is_ready else "Groq transcriber not available")
     
@@ -115,15 +151,16 @@ class GroqTranscriberWrapper:
 
 
 class OpenAITranscriberWrapper:
-    def __init__(self, api_key: str, model: str):
+    def __init__(self, api_key: str, model: str, rpm: int = 0):
         self.api_key = api_key
         self.model = model
+        self.rpm = rpm
         self._transcriber = None
         self.is_ready = False
     
     async def initialize(self) -> None:
         from services.cloud_transcriber import OpenAITranscriber
-        self._transcriber = OpenAITranscriber(api_key=self.api_key, model=self.model)
+        self._transcriber = OpenAITranscriber(api_key=self.api_key, model=self.model, rpm=self.rpm)
         self.is_ready = await self._transcriber.is_available()
         print("OpenAI transcriber ready" if self.is_ready else "OpenAI transcriber not available")
     
@@ -143,11 +180,16 @@ class DeepgramTranscriberWrapper:
         key_pool = KeyPool(self.api_keys)
         self._transcriber = DeepgramTranscriber(key_pool=key_pool)
         self.is_ready = await self._transcriber.is_available()
+        if self.is_ready:
+            await self._transcriber.prewarm()
         print(f"Deepgram transcriber ready ({len(self.api_keys)} keys)" if self.is_ready else "Deepgram transcriber not available")
     
     async def transcribe(self, audio_input: Union[bytes, str], progress_callback: Any = None) -> dict[str, Any]:
         if not self._transcriber: return {"error": "Not initialized", "text": ""}
         return await self._transcriber.transcribe(audio_input, progress_callback=progress_callback)
+    
+    async def close(self) -> None:
+        if self._transcriber: await self._transcriber.close()
 
 class RotationTranscriberWrapper:
     """
@@ -161,6 +203,11 @@ class RotationTranscriberWrapper:
     async def initialize(self) -> None:
         pass # Already initialized
     
+    async def close(self) -> None:
+        for transcriber in (self.primary, self.secondary):
+            close = getattr(transcriber, "close", None)
+            if close: await close()
+    
     async def transcribe(self, audio_input: Union[bytes, str], progress_callback: Any = None) -> dict[str, Any]:
         try:
             # Try Primary (Groq)
@@ -3,42 +3,72 @@ Transcription Merger
 Handles merging of overlapping transcription segments.
 """
 
-from typing import Any
+import hashlib
+import re
+from collections import deque
+from typing import Any, Optional
+
+# Fixed step of _chunk_audio's segmenting, used when real offsets are unknown
+DEFAULT_CHUNK_SECONDS = 600.0
+
+_NON_WORD = re.compile(r"\W+")
+
+
+# Segments remembered for overlap de-duplication
+RECENT_FINGERPRINTS = 8
+
+
+def _fingerprint(text: str) -> Optional[bytes]:
+    """8-byte hash of the casefolded text without punctuation/whitespace (None if empty)."""
+    normalized = _NON_WORD.sub("", text).lower()
+    if not normalized:
+        return None
+    return hashlib.blake2b(normalized.encode(), digest_size=8).digest()
+
 
 class TranscriptionMerger:
     """Utility to merge transcription segments from overlapping chunks."""
     
     @staticmethod
-    def merge_segments(all_chunks: list[dict[str, Any]], overlap_seconds: float = 10.0) -> list[dict[str, Any]]:
+    def merge_segments(
+        all_chunks: list[dict[str, Any]],
+        chunk_starts: Optional[list[float]] = None,
+        overlap_seconds: float = 10.0,
+    ) -> list[dict[str, Any]]:
         """
         Merge segments from multiple chunks.
         all_chunks: List of result dicts from transcribers.
         Each chunk result should have 'segments' and 'text'.
+        chunk_starts: Real start offset (seconds) of each chunk in the source.
+        Without it, offsets come from each chunk's 'duration' when reported,
+        else the fixed chunk_duration step used by _chunk_audio.
         """
         if not all_chunks:
             return []
             
         merged_segments = []
-        global_offset = 0.0
-        # Recommended overlap for deduplication logic
-        # We usually take the more "complete" version from the middle of the chunk
+        offset = 0.0
+        # Fingerprints of the most recently merged segments; an overlap window
+        # holds a handful of segments, so a short deque is enough
+        recent: deque[bytes] = deque(maxlen=RECENT_FINGERPRINTS)
         
         for i, chunk in enumerate(all_chunks):
-            segments = chunk.get("segments", [])
+            if chunk_starts is not None:
+                offset = chunk_starts[i]
+            
+            # Only segments reaching back into already-merged audio can be duplicates
+            boundary = merged_segments[-1]["end"] if merged_segments else 0.0
+            window_start = boundary - overlap_seconds
             
-            # Simple offset adjustment first
-            for seg in segments:
-                start = seg.get("start", 0.0) + global_offset
-                end = seg.get("end", 0.0) + global_offset
+            for seg in chunk.get("segments", []):
+                start = seg.get("start", 0.0) + offset
+                end = seg.get("end", 0.0) + offset
                 text = seg.get("text", "").strip()
+                fingerprint = _fingerprint(text)
                 
-                # Deduplication logic:
-                # If this segment starts before the last merged segment ends,
-                # it might be an overlap.
-                if merged_segments:
-                    last_end = merged_segments[-1]["end"]
-                    # If this segment is almost entirely within the previous one, skip it
-                    if start < last_end - 1.0: # 1s buffer
+                if start < boundary:
+                    # Already covered by the previous chunk (or older than the window)
+                    if start < window_start or fingerprint is None or fingerprint in recent:
                         continue
                 
                 merged_segments.append({
@@ -46,14 +76,11 @@ class TranscriptionMerger:
                     "end": end,
                     "text": text
                 })
+                if fingerprint is not None:
+                    recent.append(fingerprint)
             
-            # Update global offset for next chunk
-            # If chunking was 10m (600s) with 10s overlap, 
-            # the next chunk starts at 600s, 1200s, etc.
-            # But the transcriber result might have actual duration.
-            # We assume a fixed offset based on how we split.
-            # However, for 10m chunks, offset is 600 * i
-            global_offset += 600.0 # Fixed step based on chunk_duration in _chunk_audio
+            if chunk_starts is None:
+                offset += chunk.get("duration") or DEFAULT_CHUNK_SECONDS
             
         return merged_segments
 
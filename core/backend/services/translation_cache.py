@@ -0,0 +1,147 @@
+"""
+Translation Cache
+In-memory LRU in front of an SQLite table, so repeated subtitle lines
+(titles, speaker tags, refrains) are only translated once.
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+# Pending writes are committed in groups of this size (and on close)
+FLUSH_EVERY = 64
+# Keys per SELECT ... IN (...), below SQLite's bound-parameter limit
+LOOKUP_CHUNK = 500
+
+
+class TranslationCache:
+    """Maps (text, source_lang, target_lang) to a translation."""
+
+    def __init__(self, db_path: Optional[Path], max_entries: int = 4096):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._pending: list[tuple[str, str, str]] = []
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, target_lang: str, source_lang: str) -> str:
+        return hashlib.sha1(f"{source_lang}\0{target_lang}\0{text}".encode()).hexdigest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._db is None and self.db_path is not None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations "
+                "(hash TEXT PRIMARY KEY, lang TEXT, text TEXT)"
+            )
+        return self._db
+
+    def _remember(self, key: str, translated: str) -> None:
+        self._memory[key] = translated
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _db_get(self, key: str) -> Optional[str]:
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return None
+            row = db.execute("SELECT text FROM translations WHERE hash = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _db_get_many(self, keys: list[str]) -> dict[str, str]:
+        found: dict[str, str] = {}
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return found
+            for i in range(0, len(keys), LOOKUP_CHUNK):
+                chunk = keys[i:i + LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(db.execute(
+                    f"SELECT hash, text FROM translations WHERE hash IN ({placeholders})", chunk
+                ).fetchall())
+        return found
+
+    def _db_put(self, rows: list[tuple[str, str, str]]) -> None:
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return
+            db.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?)", rows)
+            db.commit()
+
+    async def get(self, text: str, target_lang: str, source_lang: str) -> Optional[str]:
+        key = self.key(text, target_lang, source_lang)
+        translated = self._memory.get(key)
+        if translated is not None:
+            self._memory.move_to_end(key)
+            return translated
+        if self.db_path is None:
+            return None
+
+        try:
+            translated = await asyncio.to_thread(self._db_get, key)
+        except sqlite3.Error as e:
+            print(f"⚠️ Translation cache read failed: {e}")
+            return None
+        if translated is not None:
+            self._remember(key, translated)
+        return translated
+
+    async def get_many(self, texts: list[str], target_lang: str, source_lang: str) -> list[Optional[str]]:
+        """Like get() for each text, with all SQLite lookups in one worker-thread hop."""
+        keys = [self.key(text, target_lang, source_lang) for text in texts]
+        results: list[Optional[str]] = []
+        for key in keys:
+            translated = self._memory.get(key)
+            if translated is not None:
+                self._memory.move_to_end(key)
+            results.append(translated)
+        misses = list(dict.fromkeys(k for k, hit in zip(keys, results) if hit is None))
+        if not misses or self.db_path is None:
+            return results
+
+        try:
+            found = await asyncio.to_thread(self._db_get_many, misses)
+        except sqlite3.Error as e:
+            print(f"⚠️ Translation cache read failed: {e}")
+            return results
+        for key, translated in found.items():
+            self._remember(key, translated)
+        return [hit if hit is not None else found.get(key) for key, hit in zip(keys, results)]
+
+    async def put(self, text: str, target_lang: str, source_lang: str, translated: str) -> None:
+        key = self.key(text, target_lang, source_lang)
+        self._remember(key, translated)
+        if self.db_path is None:
+            return
+
+        self._pending.append((key, target_lang, translated))
+        if len(self._pending) >= FLUSH_EVERY:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write pending entries to SQLite."""
+        rows, self._pending = self._pending, []
+        if not rows:
+            return
+        try:
+            await asyncio.to_thread(self._db_put, rows)
+        except sqlite3.Error as e:
+            print(f"⚠️ Translation cache write failed: {e}")
+
+    async def close(self) -> None:
+        await self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -4,10 +4,41 @@ Translation Service - Translate subtitles to target language.
 Uses free Google Translate API (unofficial).
 """
 
+import asyncio
+import logging
+import random
+import re
+import tempfile
+from pathlib import Path
 from typing import Any
 
 import httpx
 
+from services.translation_cache import TranslationCache
+
+try:
+    import h2  # noqa: F401  (installed by httpx[http2])
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+
+logger = logging.getLogger("bypass.backend")
+
+DEFAULT_CACHE_PATH = Path(tempfile.gettempdir()) / "bypass_subtitles" / "translations.sqlite3"
+
+_SEG_TAG = re.compile(r"<<<\s*SEG\s*(\d+)\s*>>>")
+
+
+def _split_tagged(text: str, count: int) -> list[str | None]:
+    """
+    Split a <<<SEG i>>> tagged reply back into `count` segments, in order.
+    Segments whose tag is missing or mangled come back as None.
+    """
+    parts = _SEG_TAG.split(text)
+    segments = {int(num): body.strip() for num, body in zip(parts[1::2], parts[2::2])}
+    return [segments.get(i) for i in range(count)]
+
 
 class TranslationService:
     """
@@ -16,13 +47,24 @@ class TranslationService:
     Uses free Google Translate API by default.
     """
     
-    def __init__(self):
+    def __init__(self, cache_path: Path | None = None):
         self._client: httpx.AsyncClient | None = None
+        # Repeated lines are translated once (None = in-memory only)
+        self._cache = TranslationCache(cache_path)
     
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create HTTP client."""
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=10.0)
+            self._client = httpx.AsyncClient(
+                # HTTP/2 multiplexes concurrent batch requests over one TLS connection
+                http2=_HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(10.0, connect=5.0),
+                limits=httpx.Limits(
+                    max_keepalive_connections=32,
+                    max_connections=64,
+                    keepalive_expiry=30.0,
+                ),
+            )
         return self._client
     
     async def translate(
@@ -41,20 +83,36 @@ class TranslationService:
         if not target_lang:
             return {"translated": text, "original": text, "detected_lang": source_lang}
         
+        cached = await self._cache.get(text, target_lang, source_lang)
+        if cached is not None:
+            return {"translated": cached, "original": text, "detected_lang": source_lang, "cached": True}
+        
+        result = await self._translate_uncached(text, target_lang, source_lang)
+        if "error" not in result:
+            await self._cache.put(text, target_lang, source_lang, result["translated"])
+        return result
+    
+    async def _translate_uncached(
+        self,
+        text: str,
+        target_lang: str,
+        source_lang: str,
+    ) -> dict[str, Any]:
+        """Provider call without the cache: LLM first, Google as fallback."""
         # Try LLM first
         try:
-            from config import settings
+            from config import get_settings
+            settings = get_settings()
             if settings.groq_api_key or settings.openai_api_key:
                 return await self._translate_llm(text, target_lang, source_lang)
         except Exception as e:
-            print(f"⚠️ LLM Translation failed: {e}. Falling back to Google.")
+            logger.warning("⚠️ LLM Translation failed: %s. Falling back to Google.", e)
         
         # Fallback to Google
         try:
-            result = await self._translate_google(text, target_lang, source_lang)
-            return result
+            return await self._translate_google(text, target_lang, source_lang)
         except Exception as e:
-            print(f"❌ Translation error: {e}")
+            logger.error("❌ Translation error: %s", e)
             return {
                 "translated": text,
                 "original": text,
@@ -71,7 +129,8 @@ class TranslationService:
         """
         Translate using Groq or OpenAI LLM.
         """
-        from config import settings
+        from config import get_settings
+        settings = get_settings()
         
         client = await self._get_client()
         
@@ -91,7 +150,8 @@ class TranslationService:
         system_prompt = (
             f"You are a professional translator. Translate the following text to {target_lang}. "
             "Maintain the original meaning, tone, and formatting. "
-            "Only return the translated text without any explanation, quotes, or markdown."
+            "Only return the translated text without any explanation, quotes, or markdown. "
+            "Keep every <<<SEG n>>> tag exactly as it is, each on its own line."
         )
         
         payload = {
@@ -135,60 +195,95 @@ class TranslationService:
         """
         Translate multiple texts using batched requests.
         Includes retry logic and jitter to avoid rate limits.
+        Segments are cached one by one, so only uncached texts reach the model.
         """
         if not texts:
             return []
         
-        import asyncio
-        import random
+        from config import get_settings
+        settings = get_settings()
+        
+        cached = await self._cache.get_many(texts, target_lang, source_lang)
+        misses = list(dict.fromkeys(t for t, hit in zip(texts, cached) if hit is None))
+        
+        sem = asyncio.Semaphore(max(1, settings.translate_concurrency))
         
-        results = []
+        async def run(index: int, batch: list[str]) -> list[str]:
+            async with sem:
+                return await self._translate_one_batch(index, batch, target_lang, source_lang)
         
-        for i in range(0, len(texts), batch_size):
-            # Polite delay between batches
-            if i > 0:
-                await asyncio.sleep(random.uniform(0.5, 1.5))
+        batches = [misses[i:i + batch_size] for i in range(0, len(misses), batch_size)]
+        translated = await asyncio.gather(*(run(i, batch) for i, batch in enumerate(batches)))
+        fresh = dict(zip(misses, (text for batch in translated for text in batch)))
+        return [hit if hit is not None else fresh[t] for t, hit in zip(texts, cached)]
+    
+    async def _translate_batch_once(
+        self,
+        batch: list[str],
+        target_lang: str,
+        source_lang: str,
+    ) -> list[str | None]:
+        """
+        One provider round trip for a batch; None marks a segment that did not
+        come back. The LLM is told to keep numbered <<<SEG i>>> tags, so its
+        segments are matched back by number. Google gets no instructions, so
+        it is sent one segment per line instead and must return as many lines.
+        """
+        from config import get_settings
+        settings = get_settings()
+        if settings.groq_api_key or settings.openai_api_key:
+            combined_text = "\n".join(f"<<<SEG {i}>>>\n{text}" for i, text in enumerate(batch))
+            try:
+                res = await self._translate_llm(combined_text, target_lang, source_lang)
+                return _split_tagged(res["translated"], len(batch))
+            except Exception as e:
+                logger.warning("⚠️ LLM Translation failed: %s. Falling back to Google.", e)
+        
+        lines = [" ".join(text.splitlines()) for text in batch]
+        res = await self._translate_google("\n".join(lines), target_lang, source_lang)
+        translated = res["translated"].split("\n")
+        if len(translated) != len(batch):
+            raise ValueError(f"Batch mismatch. Expected: {len(batch)}, Got: {len(translated)}")
+        return [line.strip() for line in translated]
+    
+    async def _translate_one_batch(
+        self,
+        index: int,
+        batch: list[str],
+        target_lang: str,
+        source_lang: str,
+    ) -> list[str]:
+        """
+        Translate one batch with retries; falls back to the original text.
+        Segments missing from a reply keep their original text, the rest are used.
+        """
+        # Simple retry loop
+        for attempt in range(2):
+            try:
+                logger.info("🌐 Translating batch %d (%d segments) [Attempt %d]...", index + 1, len(batch), attempt + 1)
+                segments = await self._translate_batch_once(batch, target_lang, source_lang)
+                if all(seg is None for seg in segments):
+                    raise ValueError("No segments found in reply")
                 
-            batch = texts[i:i + batch_size]
-            combined_text = "\n\n".join(batch)
-            
-            # Simple retry loop
-            success = False
-            for attempt in range(2):
-                try:
-                    print(f"🌐 Translating batch {i // batch_size + 1} ({len(batch)} segments) [Attempt {attempt+1}]...")
-                    res = await self.translate(combined_text, target_lang, source_lang)
-                    translated_batch = res.get("translated", combined_text)
-                    
-                    # Split logic
-                    translated_list = translated_batch.split("\n\n")
-                    if len(translated_list) != len(batch):
-                         translated_list = translated_batch.split("\n")
-                         translated_list = [t.strip() for t in translated_list if t.strip()]
-                    
-                    # Validation
-                    if len(translated_list) != len(batch):
-                         print(f"⚠️ Batch mismatch. Expected: {len(batch)}, Got: {len(translated_list)}")
-                         # Use strict padding if lengths differ
-                         if len(translated_list) > len(batch):
-                             translated_list = translated_list[:len(batch)]
-                         else:
-                             translated_list.extend(batch[len(translated_list):])
-                    
-                    results.extend(translated_list)
-                    success = True
-                    break
-                    
-                except Exception as e:
-                    print(f"❌ Batch error: {e}")
-                    await asyncio.sleep(1 * (attempt + 1))
-            
-            # Fallback if all attempts fail
-            if not success:
-                print(f"⛔ Batch failed permanently. Using original text.")
-                results.extend(batch)
+                # Only segments that came back are worth remembering
+                missing = 0
+                for text, translated in zip(batch, segments):
+                    if translated is None:
+                        missing += 1
+                    else:
+                        await self._cache.put(text, target_lang, source_lang, translated)
+                if missing:
+                    logger.warning("⚠️ Batch %d: %d segment(s) missing, keeping original text", index + 1, missing)
+                return [orig if seg is None else seg for orig, seg in zip(batch, segments)]
                 
-        return results
+            except Exception as e:
+                logger.warning("❌ Batch error: %s", e)
+                # Jittered backoff so parallel batches don't retry in lockstep
+                await asyncio.sleep((attempt + 1) * random.uniform(0.5, 1.5))
+        
+        # Fallback if all attempts fail
+        logger.error("⛔ Batch failed permanently. Using original text.")
+        return batch
     
     async def _translate_google(
         self,
@@ -244,7 +339,8 @@ class TranslationService:
         }
     
     async def close(self):
-        """Close HTTP client."""
+        """Close HTTP client and flush the translation cache."""
+        await self._cache.close()
         if self._client:
             await self._client.aclose()
             self._client = None
@@ -258,5 +354,9 @@ def get_translator() -> TranslationService:
     """Get translator singleton instance."""
     global _translator
     if _translator is None:
-        _translator = TranslationService()
+        from config import get_settings
+        cache_path = get_settings().translation_cache_path
+        _translator = TranslationService(
+            cache_path=Path(cache_path) if cache_path else DEFAULT_CACHE_PATH
+        )
     return _translator
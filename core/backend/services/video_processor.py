@@ -8,7 +8,7 @@ import os
 import shutil
 import tempfile
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
 from models.job import VideoJob, JobStatus, update_job
 
@@ -21,6 +21,50 @@ def _check_ffmpeg() -> bool:
 
 FFMPEG_AVAILABLE = _check_ffmpeg()
 
+_nvenc_cache: bool | None = None
+
+
+async def _nvenc_available() -> bool:
+    """Check once whether this FFmpeg build ships the h264_nvenc encoder."""
+    global _nvenc_cache
+    if _nvenc_cache is None:
+        _nvenc_cache = False
+        if FFMPEG_AVAILABLE:
+            process = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-hide_banner", "-encoders",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await process.communicate()
+            _nvenc_cache = b"h264_nvenc" in stdout
+    return _nvenc_cache
+
+
+def _disable_nvenc() -> None:
+    """Stop trying NVENC once it has failed at runtime (no/old GPU)."""
+    global _nvenc_cache
+    _nvenc_cache = False
+
+
+_overlay_cuda_cache: bool | None = None
+
+
+async def _overlay_cuda_available() -> bool:
+    """Check once whether this FFmpeg build has the overlay_cuda filter."""
+    global _overlay_cuda_cache
+    if _overlay_cuda_cache is None:
+        _overlay_cuda_cache = False
+        if FFMPEG_AVAILABLE:
+            process = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-hide_banner", "-filters",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await process.communicate()
+            _overlay_cuda_cache = b"overlay_cuda" in stdout
+    return _overlay_cuda_cache
+
+
 # Temp directory for processing
 TEMP_DIR = Path(tempfile.gettempdir()) / "bypass_subtitles"
 TEMP_DIR.mkdir(exist_ok=True)
@@ -33,36 +77,55 @@ class VideoProcessor:
         if not FFMPEG_AVAILABLE:
             print("⚠️ FFmpeg not found in PATH. Video processing will be limited.")
     
-    async def save_uploaded_file(self, job: VideoJob, file_content: bytes, filename: str) -> str:
-        """Save uploaded video file to temp directory."""
+    async def save_uploaded_file(self, job: VideoJob, file_obj: BinaryIO, filename: str) -> str:
+        """Stream uploaded video file to temp directory (chunked, off the event loop)."""
         job_dir = TEMP_DIR / job.id
         job_dir.mkdir(exist_ok=True)
         
         video_path = job_dir / filename
-        video_path.write_bytes(file_content)
+        await asyncio.to_thread(self._copy_to_path, file_obj, video_path)
         
         update_job(job.id, video_path=str(video_path))
         return str(video_path)
     
+    @staticmethod
+    def _copy_to_path(file_obj: BinaryIO, path: Path, chunk_size: int = 1 << 20) -> None:
+        file_obj.seek(0)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(file_obj, out, chunk_size)
+    
     async def extract_audio(self, job: VideoJob) -> str:
         """Extract audio from video as WAV (16kHz mono for Whisper)."""
+        job_dir = TEMP_DIR / job.id
+        audio_path = job_dir / "audio.wav"
+        
+        await self._run_extract(job, [str(audio_path)])
+        
+        update_job(job.id, audio_path=str(audio_path), progress=20)
+        return str(audio_path)
+    
+    async def extract_audio_to_bytes(self, job: VideoJob) -> bytes:
+        """Extract audio as raw 16kHz mono PCM piped from FFmpeg (no WAV on disk)."""
+        pcm = await self._run_extract(job, ["-f", "s16le", "pipe:1"])
+        
+        update_job(job.id, progress=20)
+        return pcm
+    
+    async def _run_extract(self, job: VideoJob, output: list[str]) -> bytes:
         if not job.video_path:
             raise ValueError("No video path set")
         
         update_job(job.id, status=JobStatus.EXTRACTING, progress=10)
         
-        job_dir = TEMP_DIR / job.id
-        audio_path = job_dir / "audio.wav"
-        
-        # FFmpeg command: extract audio, convert to 16kHz mono WAV
+        # FFmpeg command: extract audio, convert to 16kHz mono 16-bit PCM
         cmd = [
-            "ffmpeg", "-y",
+            "ffmpeg", "-y", "-nostdin", "-hide_banner", "-nostats", "-loglevel", "error",
             "-i", job.video_path,
             "-vn",  # No video
             "-acodec", "pcm_s16le",  # 16-bit PCM
             "-ar", "16000",  # 16kHz sample rate
             "-ac", "1",  # Mono
-            str(audio_path)
+            *output
         ]
         
         process = await asyncio.create_subprocess_exec(
@@ -76,30 +139,27 @@ class VideoProcessor:
             error_msg = stderr.decode() if stderr else "Unknown FFmpeg error"
             update_job(job.id, status=JobStatus.ERROR, error_message=error_msg)
             raise RuntimeError(f"FFmpeg failed: {error_msg}")
-        
-        update_job(job.id, audio_path=str(audio_path), progress=20)
-        return str(audio_path)
+        return stdout
     
     async def generate_srt(self, job: VideoJob, segments: list[dict]) -> str:
         """Generate SRT file from transcription segments."""
         job_dir = TEMP_DIR / job.id
         srt_path = job_dir / "subtitles.srt"
         
-        srt_content = []
-        for i, seg in enumerate(segments, 1):
-            start = self._seconds_to_srt_time(seg.get("start", 0))
-            end = self._seconds_to_srt_time(seg.get("end", 0))
-            text = seg.get("translated", seg.get("text", ""))
-            
-            srt_content.append(f"{i}")
-            srt_content.append(f"{start} --> {end}")
-            srt_content.append(text)
-            srt_content.append("")
-        
-        srt_path.write_text("\n".join(srt_content), encoding="utf-8")
+        await asyncio.to_thread(self._write_srt, srt_path, segments)
         update_job(job.id, srt_path=str(srt_path), segments=segments)
         return str(srt_path)
     
+    def _write_srt(self, srt_path: Path, segments: list[dict]) -> None:
+        """Stream SRT cues straight to disk (no list of lines held in memory)."""
+        to_time = self._seconds_to_srt_time
+        with srt_path.open("w", encoding="utf-8") as f:
+            for i, seg in enumerate(segments, 1):
+                start = to_time(seg.get("start", 0))
+                end = to_time(seg.get("end", 0))
+                text = seg.get("translated", seg.get("text", ""))
+                f.write(f"{i}\n{start} --> {end}\n{text}\n\n")
+    
     async def burn_subtitles(self, job: VideoJob) -> str:
         """Burn SRT subtitles into video using FFmpeg."""
         if not job.video_path or not job.srt_path:
@@ -114,20 +174,40 @@ class VideoProcessor:
         # Note: Need to escape special chars in path for subtitles filter
         srt_escaped = job.srt_path.replace(":", r"\:").replace("\\", "/")
         
-        cmd = [
-            "ffmpeg", "-y",
-            "-i", job.video_path,
-            "-vf", f"subtitles='{srt_escaped}'",
-            "-c:a", "copy",  # Copy audio stream
-            str(output_path)
-        ]
+        if await _nvenc_available() and await _overlay_cuda_available():
+            if await self._burn_with_overlay_cuda(job, srt_escaped, output_path):
+                update_job(job.id, burned_video_path=str(output_path), progress=95)
+                return str(output_path)
+            print("⚠️ GPU overlay burn failed, falling back to the subtitles filter...")
         
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate()
+        for use_nvenc in ([True, False] if await _nvenc_available() else [False]):
+            cmd = ["ffmpeg", "-y", "-nostdin", "-hide_banner", "-nostats", "-loglevel", "error"]
+            if use_nvenc:
+                cmd += ["-hwaccel", "cuda"]
+            cmd += [
+                "-i", job.video_path,
+                "-vf", f"subtitles='{srt_escaped}'",
+            ]
+            if use_nvenc:
+                # Encode on the GPU; the subtitles filter itself still runs on CPU
+                cmd += ["-c:v", "h264_nvenc", "-preset", "p4", "-rc", "vbr", "-cq", "23"]
+            cmd += [
+                "-c:a", "copy",  # Copy audio stream
+                str(output_path)
+            ]
+            
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await process.communicate()
+            if process.returncode == 0:
+                break
+            if use_nvenc:
+                # Encoder is compiled in but unusable (no/old GPU): stop trying it
+                _disable_nvenc()
+                print("⚠️ NVENC encode failed, retrying with libx264...")
         
         if process.returncode != 0:
             error_msg = stderr.decode() if stderr else "Unknown FFmpeg error"
@@ -137,12 +217,75 @@ class VideoProcessor:
         update_job(job.id, burned_video_path=str(output_path), progress=95)
         return str(output_path)
     
-    def _seconds_to_srt_time(self, seconds: float) -> str:
+    async def _burn_with_overlay_cuda(self, job: VideoJob, srt_escaped: str, output_path: Path) -> bool:
+        """
+        Keep decode, compositing and encode on the GPU: libass renders the
+        subtitles once onto a transparent low-fps track, which overlay_cuda
+        then blends into the hardware-decoded frames before NVENC.
+        """
+        probe = await self._probe_video(job.video_path)
+        if probe is None:
+            return False
+        width, height, duration = probe
+        
+        overlay_path = TEMP_DIR / job.id / "subtitles_overlay.mov"
+        quiet = ["ffmpeg", "-y", "-nostdin", "-hide_banner", "-nostats", "-loglevel", "error"]
+        render = quiet + [
+            "-f", "lavfi",
+            "-i", f"color=c=black@0.0:s={width}x{height}:r=10:d={duration},format=rgba",
+            "-vf", f"subtitles='{srt_escaped}':alpha=1",
+            "-c:v", "qtrle",  # Lossless, keeps the alpha channel
+            str(overlay_path)
+        ]
+        burn = quiet + [
+            "-hwaccel", "cuda", "-hwaccel_output_format", "cuda",
+            "-i", job.video_path,
+            "-i", str(overlay_path),
+            "-filter_complex", "[1:v]format=yuva420p,hwupload_cuda[subs];[0:v][subs]overlay_cuda[v]",
+            "-map", "[v]", "-map", "0:a?",
+            "-c:v", "h264_nvenc", "-preset", "p4", "-rc", "vbr", "-cq", "23",
+            "-c:a", "copy",
+            str(output_path)
+        ]
+        try:
+            for cmd in (render, burn):
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                _, stderr = await process.communicate()
+                if process.returncode != 0:
+                    print(f"⚠️ FFmpeg GPU overlay step failed: {stderr.decode(errors='replace').strip()}")
+                    return False
+            return True
+        finally:
+            overlay_path.unlink(missing_ok=True)
+    
+    async def _probe_video(self, video_path: str) -> tuple[int, int, float] | None:
+        """(width, height, duration) of the first video stream, or None."""
+        process = await asyncio.create_subprocess_exec(
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=width,height:format=duration",
+            "-of", "default=nw=1:nk=1", video_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await process.communicate()
+        try:
+            width, height, duration = stdout.split()[:3]
+            return int(width), int(height), float(duration)
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _seconds_to_srt_time(seconds: float) -> str:
         """Convert seconds to SRT timestamp format (HH:MM:SS,mmm)."""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        millis = int((seconds % 1) * 1000)
+        # Integer milliseconds, rounded so 3723.042 doesn't come out as ,041
+        secs, millis = divmod(round(seconds * 1000), 1000)
+        minutes, secs = divmod(secs, 60)
+        hours, minutes = divmod(minutes, 60)
         return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
     
     async def cleanup_job(self, job_id: str) -> None:
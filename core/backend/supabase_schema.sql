@@ -30,6 +30,10 @@ create table if not exists public.training_datasets (
   created_at timestamp with time zone default now()
 );
 
+-- One training record per job (lets the backend upsert with on_conflict=source_job_id)
+create unique index if not exists training_datasets_source_job_id_key
+  on public.training_datasets (source_job_id);
+
 -- 3. Enable Row Level Security (RLS) - MUST be run AFTER tables are created
 alter table public.jobs enable row level security;
 alter table public.training_datasets enable row level security;
@@ -0,0 +1,26 @@
+import httpx
+import pytest
+
+
+@pytest.fixture(scope="session")
+def app_instance():
+    from main import app
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app_instance):
+    from fastapi.testclient import TestClient
+
+    # Not entered as a context manager: that would run the lifespan and load
+    # a Whisper model, which none of these endpoint tests need
+    return TestClient(app_instance)
+
+
+@pytest.fixture(scope="session")
+async def aclient(app_instance):
+    # In-process ASGI calls on the session loop, so plain HTTP tests skip
+    # TestClient's portal thread; websockets still go through `client`
+    transport = httpx.ASGITransport(app=app_instance)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
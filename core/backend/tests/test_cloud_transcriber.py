@@ -0,0 +1,269 @@
+import asyncio
+import pytest
+from services.cloud_transcriber import CloudTranscriberBase
+
+
+class FakeTranscriber(CloudTranscriberBase):
+    """Cloud transcriber with a canned per-chunk response."""
+
+    def __init__(self, delays=None, fail_on=None):
+        self.delays = delays or {}
+        self.fail_on = fail_on
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.finished = []
+
+    async def transcribe(self, audio_data, progress_callback=None):
+        raise NotImplementedError
+
+    async def is_available(self):
+        return True
+
+    async def _transcribe_file(self, wav_path):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(wav_path, 0))
+        finally:
+            self.in_flight -= 1
+        self.finished.append(wav_path)
+        if wav_path == self.fail_on:
+            return {"error": f"failed {wav_path}", "text": ""}
+        return {
+            "text": wav_path,
+            "segments": [{"start": 0.0, "end": 1.0, "text": wav_path}],
+            "language": "en",
+        }
+
+
+@pytest.mark.asyncio
+async def test_chunks_transcribed_in_parallel_keep_order():
+    chunks = ["c0", "c1", "c2"]
+    service = FakeTranscriber(delays={"c0": 0.03, "c1": 0.01})
+    progress = []
+
+    async def on_progress(current, total):
+        progress.append((current, total))
+
+    result = await service._transcribe_chunks_parallel(
+        chunks, "source.wav", "fake", progress_callback=on_progress, max_concurrent=2
+    )
+
+    assert result["text"] == "c0 c1 c2"
+    assert result["provider"] == "fake"
+    assert service.max_in_flight == 2
+    assert progress[-1] == (3, 3)
+
+
+@pytest.mark.asyncio
+async def test_chunk_error_is_returned():
+    service = FakeTranscriber(fail_on="c1")
+
+    result = await service._transcribe_chunks_parallel(["c0", "c1"], "source.wav", "fake")
+
+    assert result["error"] == "failed c1"
+
+
+def test_pcm_to_wav_header():
+    pcm = bytes(32000)
+    wav = FakeTranscriber()._pcm_to_wav(pcm)
+
+    assert len(wav) == 44 + len(pcm)
+    assert wav[:4] == b"RIFF" and wav[8:12] == b"WAVE"
+    assert int.from_bytes(wav[4:8], "little") == 36 + len(pcm)
+    assert int.from_bytes(wav[24:28], "little") == 16000
+    assert int.from_bytes(wav[40:44], "little") == len(pcm)
+
+
+def test_key_pool_rotates():
+    from services.cloud_transcriber import KeyPool
+
+    pool = KeyPool(["a", "b"])
+    assert [pool.get_next_key() for _ in range(3)] == ["a", "b", "a"]
+    assert KeyPool([]).get_next_key() is None
+
+
+@pytest.mark.asyncio
+async def test_chunk_error_cancels_outstanding_chunks():
+    service = FakeTranscriber(delays={"c0": 5.0}, fail_on="c1")
+
+    result = await asyncio.wait_for(
+        service._transcribe_chunks_parallel(["c0", "c1"], "source.wav", "fake"), timeout=1.0
+    )
+
+    assert result["error"] == "failed c1"
+    assert service.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_chunk_files_removed_but_source_kept(tmp_path):
+    source = tmp_path / "source.wav"
+    chunk = tmp_path / "source_chunk_000.wav"
+    source.write_bytes(b"src")
+    chunk.write_bytes(b"chunk")
+    service = FakeTranscriber()
+
+    await service._transcribe_chunks_parallel(
+        [str(chunk), str(tmp_path / "already_gone.wav")], str(source), "fake"
+    )
+
+    assert source.exists()
+    assert not chunk.exists()
+
+
+class FakeResponse:
+    status = 200
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return {}
+
+
+class FakeSession:
+    closed = False
+
+    def __init__(self):
+        self.body = b""
+        self.headers = {}
+
+    def post(self, url, headers, params, data):
+        self.headers = headers
+        self.data = data
+        return self
+
+    async def __aenter__(self):
+        async for block in self.data:
+            self.body += block
+        return FakeResponse()
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_deepgram_streams_file_upload(tmp_path):
+    from services.cloud_transcriber import DeepgramTranscriber, KeyPool
+
+    wav = tmp_path / "audio.wav"
+    payload = bytes(range(256)) * 1024
+    wav.write_bytes(payload)
+    service = DeepgramTranscriber(KeyPool(["key"]))
+    service.STREAM_BLOCK_SIZE = 4096
+    service._session = FakeSession()
+
+    result = await service._transcribe_file(str(wav))
+
+    assert result["provider"] == "deepgram"
+    assert service._session.body == payload
+    assert service._session.headers["Content-Length"] == str(len(payload))
+
+
+@pytest.mark.asyncio
+async def test_transcribe_keeps_caller_owned_path(tmp_path):
+    from services.cloud_transcriber import DeepgramTranscriber, KeyPool
+
+    wav = tmp_path / "audio.wav"
+    wav.write_bytes(bytes(4096))
+    service = DeepgramTranscriber(KeyPool(["key"]))
+    service._session = FakeSession()
+
+    async def short_duration(path):
+        return 1.0
+
+    service._get_audio_duration = short_duration
+
+    result = await service.transcribe(str(wav))
+
+    assert result["provider"] == "deepgram"
+    assert wav.exists()
+
+
+class FailingFFmpeg:
+    """Segment muxer that writes one chunk and then exits with an error."""
+
+    def __init__(self, chunk_name):
+        self.returncode = None
+        self.stdout = self._lines(chunk_name)
+
+    async def _lines(self, chunk_name):
+        yield f"{chunk_name},0.000000,600.000000\n".encode()
+
+    async def wait(self):
+        if self.returncode is None:
+            self.returncode = 1
+        return self.returncode
+
+    def kill(self):
+        self.returncode = -9
+
+
+@pytest.mark.asyncio
+async def test_chunking_failure_aborts_instead_of_truncating(tmp_path, monkeypatch):
+    source = tmp_path / "audio.wav"
+    chunk = tmp_path / "audio_chunk_000.wav"
+    source.write_bytes(b"src")
+    chunk.write_bytes(b"chunk")
+
+    async def fake_exec(*cmd, **kwargs):
+        return FailingFFmpeg(chunk.name)
+
+    monkeypatch.setattr("services.cloud_transcriber.asyncio.create_subprocess_exec", fake_exec)
+    service = FakeTranscriber()
+    chunks = service._chunk_audio(str(source), duration=1800.0)
+
+    with pytest.raises(RuntimeError, match="exit code 1"):
+        await service._transcribe_chunks_parallel(chunks, str(source), "fake")
+
+    assert source.exists()
+    assert not chunk.exists()
+
+
+def test_words_to_segments_groups_by_span():
+    from services.cloud_transcriber import _words_to_segments
+
+    words = [
+        {"word": w, "start": i * 0.8, "end": i * 0.8 + 0.7}
+        for i, w in enumerate("one two three four five six seven".split())
+    ]
+
+    segments = _words_to_segments(words)
+
+    assert [s["text"] for s in segments] == ["one two three four", "five six seven"]
+    assert segments[0]["start"] == 0.0 and segments[0]["end"] == pytest.approx(3.1)
+    assert segments[1]["start"] == pytest.approx(3.1) and segments[1]["end"] == pytest.approx(5.5)
+    assert _words_to_segments([]) == []
+
+
+@pytest.mark.asyncio
+async def test_streamed_chunks_start_before_segmenting_finishes():
+    service = FakeTranscriber()
+    seen_before_last = []
+
+    async def chunk_stream():
+        yield "c0", 0.0
+        await asyncio.sleep(0.02)
+        seen_before_last.extend(service.finished)
+        yield "c1", 600.0
+
+    result = await service._transcribe_chunks_parallel(chunk_stream(), "source.wav", "fake", total=2)
+
+    assert result["text"] == "c0 c1"
+    assert seen_before_last == ["c0"]
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_allows_burst_then_waits():
+    from services.cloud_transcriber import RateLimiter
+
+    limiter = RateLimiter(2, time_period=0.1)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(3):
+        await limiter.acquire()
+
+    assert loop.time() - start >= 0.04
@@ -1,40 +1,44 @@
 from unittest.mock import patch
 import os
-from config import Settings, TranscriptionMode
+import pytest
+from config import Settings, TranscriptionMode, load_settings
 
 
 @patch.dict(os.environ, {}, clear=True)
-def test_default_settings():
-    # Force ignore .env file by passing _env_file=None (Pydantic feature)
-    # or ensuring no env vars are present. 
-    # Settings() will still read .env if present.
-    # To truly isolate, we construct with explicit defaults or mock valid file.
-    
-    # Actually, simpler: just explicitly set mode to AUTO to test default logic *assuming* no env var overrides.
-    # But if .env exists, it overrides.
-    # Let's verify defaults by creating settings with explicit arguments matching default and see if they stick,
-    # OR we accept that 'test_default_settings' depends on environment.
-    
-    # Better approach: Test LOGIC, not defaults.
-    pass
+@pytest.mark.parametrize("groq_key,openai_key,expected", [
+    (None, None, TranscriptionMode.LOCAL),
+    ("test_key", None, TranscriptionMode.GROQ),
+    (None, "test_key", TranscriptionMode.OPENAI),
+])
+def test_effective_mode_auto(groq_key, openai_key, expected):
+    # Settings() never reads .env or the environment; load_settings() does
+    settings = Settings(transcription_mode=TranscriptionMode.AUTO, groq_api_key=groq_key, openai_api_key=openai_key)
+    assert settings.get_effective_mode() == expected
 
 @patch.dict(os.environ, {}, clear=True)
-def test_effective_mode_auto_no_keys():
-    # Pass _env_file=None to ignore .env
-    settings = Settings(_env_file=None, transcription_mode=TranscriptionMode.AUTO, groq_api_key=None, openai_api_key=None)
+def test_explicit_mode_override():
+    settings = Settings(transcription_mode=TranscriptionMode.LOCAL, groq_api_key="test_key")
     assert settings.get_effective_mode() == TranscriptionMode.LOCAL
 
 @patch.dict(os.environ, {}, clear=True)
-def test_effective_mode_auto_groq_key():
-    settings = Settings(_env_file=None, transcription_mode=TranscriptionMode.AUTO, groq_api_key="test_key", openai_api_key=None)
-    assert settings.get_effective_mode() == TranscriptionMode.GROQ
+def test_deepgram_keys_list_parsed_once():
+    settings = Settings(deepgram_api_keys=" key1, ,key2 ")
+    assert settings.deepgram_keys_list == ["key1", "key2"]
+    assert settings.get_deepgram_keys_list() is settings.deepgram_keys_list
 
-@patch.dict(os.environ, {}, clear=True)
-def test_effective_mode_auto_openai_key():
-    settings = Settings(_env_file=None, transcription_mode=TranscriptionMode.AUTO, groq_api_key=None, openai_api_key="test_key")
-    assert settings.get_effective_mode() == TranscriptionMode.OPENAI
+@patch.dict(os.environ, {"PORT": "9000", "ENABLE_VAD": "false", "TRANSCRIPTION_MODE": "groq"}, clear=True)
+def test_load_settings_coerces_environment():
+    settings = load_settings(env_file=None)
+    assert settings.port == 9000
+    assert settings.enable_vad is False
+    assert settings.transcription_mode == TranscriptionMode.GROQ
 
-@patch.dict(os.environ, {}, clear=True)
-def test_explicit_mode_override():
-    settings = Settings(_env_file=None, transcription_mode=TranscriptionMode.LOCAL, groq_api_key="test_key")
-    assert settings.get_effective_mode() == TranscriptionMode.LOCAL
+def test_env_file_strips_inline_comments(tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text('PORT=9000  # dev\nGROQ_API_KEY="abc # not a comment"\nHOST=a#b\nGROQ_MODEL="m"  # quoted\n')
+    with patch.dict(os.environ, {}, clear=True):
+        settings = load_settings(env_file=str(env_file))
+    assert settings.port == 9000
+    assert settings.groq_api_key == "abc # not a comment"
+    assert settings.host == "a#b"
+    assert settings.groq_model == "m"
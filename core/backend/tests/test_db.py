@@ -0,0 +1,48 @@
+import pytest
+from services.db import DatabaseService
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, client):
+        self.client = client
+
+    def select(self, *args):
+        return self
+
+    def delete(self):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        self.client.executes += 1
+        return FakeResponse([{"id": "job1", "status": "done"}])
+
+
+class FakeClient:
+    def __init__(self):
+        self.executes = 0
+
+    def table(self, name):
+        return FakeQuery(self)
+
+
+@pytest.mark.asyncio
+async def test_get_job_is_cached_until_delete():
+    service = DatabaseService()
+    service.client = FakeClient()
+
+    first = await service.get_job("job1")
+    second = await service.get_job("job1")
+    assert first == second == {"id": "job1", "status": "done"}
+    assert service.client.executes == 1
+
+    await service.delete_job("job1")
+    await service.get_job("job1")
+    assert service.client.executes == 3
@@ -1,31 +1,84 @@
-from fastapi.testclient import TestClient
-from main import app
+import json
+import pytest
 
-client = TestClient(app)
-
-def test_health_check_endpoint():
-    response = client.get("/health")
+@pytest.mark.asyncio(loop_scope="session")
+async def test_health_check_endpoint(aclient):
+    response = await aclient.get("/health")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
-    assert "mode" in data
+    assert data["service"] == "BypassSubtitles Core"
 
-def test_config_endpoint():
-    response = client.get("/config")
+@pytest.mark.asyncio(loop_scope="session")
+async def test_config_endpoint(aclient):
+    response = await aclient.get("/config")
     assert response.status_code == 200
     data = response.json()
-    assert "mode" in data
-    assert "groq_available" in data
+    assert data["mode"]
+    assert isinstance(data["keys"]["groq"], bool)
 
-def test_websocket_connect():
+@pytest.fixture
+def ws(client):
+    # Fresh connection per test: frame sequence numbers are per connection
     with client.websocket_connect("/ws/transcribe") as websocket:
-        # Just connect and close to verify handshake
-        pass
+        yield websocket
 
-def test_websocket_invalid_json():
-    with client.websocket_connect("/ws/transcribe") as websocket:
-        websocket.send_text("not json")
-        # Should gracefully handle or ignore, but connection remains until error sent
-        # Backend implementation sends error json then continues
-        data = websocket.receive_json()
-        assert "error" in data
+def test_websocket_invalid_json(ws):
+    # Reaching here means the handshake succeeded
+    ws.send_text("not json")
+    # Should gracefully handle or ignore, but connection remains until error sent
+    # Backend implementation sends error json then continues
+    data = ws.receive_json()
+    assert "error" in data
+
+async def test_broadcast_status_prunes_dead_connections():
+    from main import ConnectionManager
+
+    class FakeSocket:
+        def __init__(self, fail=False):
+            self.fail = fail
+            self.sent = []
+
+        async def send_text(self, payload):
+            if self.fail:
+                raise RuntimeError("closed")
+            self.sent.append(payload)
+
+    alive, dead = FakeSocket(), FakeSocket(fail=True)
+    manager = ConnectionManager()
+    manager.active_connections["job"] = {alive, dead}
+
+    await manager.broadcast_status("job", {"status": "done"})
+
+    assert len(alive.sent) == 1
+    assert manager.active_connections["job"] == {alive}
+
+def test_websocket_audio_frames_are_sequenced(ws):
+    import base64
+    audio = base64.b64encode(bytes(32000)).decode()
+    ws.send_text(json.dumps({"audio": audio}))
+    data = ws.receive_json()
+    assert data["seq"] == 0
+    assert "error" in data
+
+async def test_progress_broadcasts_are_deduped_per_job(monkeypatch):
+    import main
+    from models.job import JobStatus, create_job, delete_job
+
+    sent = []
+
+    async def fake_broadcast(job_id, payload):
+        sent.append(payload)
+
+    job = create_job("clip.mp4")
+    monkeypatch.setitem(main.manager.active_connections, job.id, set())
+    monkeypatch.setattr(main.manager, "broadcast_status", fake_broadcast)
+    try:
+        await main.update_job_and_broadcast(job.id, status=JobStatus.TRANSCRIBING, progress=30)
+        await main.update_job_and_broadcast(job.id, progress=31)
+        await main.update_job_and_broadcast(job.id, progress=33)
+        await main.update_job_and_broadcast(job.id, status=JobStatus.DONE, progress=100)
+    finally:
+        delete_job(job.id)
+
+    assert [p["progress"] if isinstance(p, dict) else "done" for p in sent] == [30, 33, "done"]
@@ -1,15 +1,34 @@
 import pytest
+import pytest_asyncio
 import asyncio
 from unittest.mock import MagicMock, patch
 from services.transcriber import TranscriberService
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_faster_whisper():
     with patch("faster_whisper.WhisperModel") as mock_class:
         mock_instance = MagicMock()
         mock_class.return_value = mock_instance
         yield mock_class, mock_instance
 
+@pytest.fixture(autouse=True)
+def reset_faster_whisper(mock_faster_whisper):
+    # The patch outlives each test, so clear calls and per-test behaviour
+    mock_class, mock_instance = mock_faster_whisper
+    mock_class.reset_mock(side_effect=True)
+    mock_instance.reset_mock(return_value=True, side_effect=True)
+
+@pytest.fixture(scope="session")
+def silence_1s_16k() -> bytes:
+    # 1 sec of silence at 16kHz 16-bit; bytes(n) zero-fills in C
+    return bytes(32000)
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def ready_service(mock_faster_whisper):
+    service = TranscriberService(device="cpu")
+    await service.initialize()
+    return service
+
 @pytest.mark.asyncio
 async def test_transcriber_initialization_cpu(mock_faster_whisper):
     mock_class, mock_instance = mock_faster_whisper
@@ -19,10 +38,10 @@ async def test_transcriber_initialization_cpu(mock_faster_whisper):
     
     assert service.is_ready is True
     assert service.device == "cpu"
-    mock_class.assert_called_with("small", device="cpu", compute_type="int8")
+    mock_class.assert_called_with("small", device="cpu", compute_type="auto")
 
-@pytest.mark.asyncio
-async def test_transcriber_transcribe_success(mock_faster_whisper):
+@pytest.mark.asyncio(loop_scope="module")
+async def test_transcriber_transcribe_success(mock_faster_whisper, ready_service, silence_1s_16k):
     _, mock_instance = mock_faster_whisper
     
     # Mock transcribe result
@@ -37,14 +56,34 @@ async def test_transcriber_transcribe_success(mock_faster_whisper):
     
     mock_instance.transcribe.return_value = ([mock_segment], mock_info)
     
-    service = TranscriberService(device="cpu")
-    await service.initialize()
-    
-    # Dummy audio data (needs to be valid byte structure for numpy)
-    dummy_audio = bytes([0] * 32000) # 1 sec of silence at 16kHz 16-bit
-    
-    result = await service.transcribe(dummy_audio)
+    result = await ready_service.transcribe(silence_1s_16k)
     
     assert result["text"] == "Hello world"
     assert result["language"] == "en"
     assert result["provider"] == "local"
+
+@pytest.mark.asyncio
+async def test_transcriber_cuda_prefers_int8_float16(mock_faster_whisper):
+    mock_class, _ = mock_faster_whisper
+    mock_class.side_effect = [ValueError("int8 unsupported"), MagicMock()]
+
+    service = TranscriberService(device="cuda")
+    await service.initialize()
+
+    assert service.device == "cuda"
+    assert mock_class.call_args_list[0].kwargs["compute_type"] == "int8_float16"
+    assert mock_class.call_args_list[1].kwargs["compute_type"] == "auto"
+
+@pytest.mark.asyncio
+async def test_transcriber_batched_pipeline(mock_faster_whisper, silence_1s_16k):
+    mock_info = MagicMock(language="en", language_probability=0.9)
+    with patch("faster_whisper.BatchedInferencePipeline") as mock_pipeline_class:
+        mock_pipeline = mock_pipeline_class.return_value
+        mock_pipeline.transcribe.return_value = ([], mock_info)
+
+        service = TranscriberService(device="cpu", batch_size=16)
+        await service.initialize()
+        result = await service.transcribe(silence_1s_16k)
+
+    assert result["language"] == "en"
+    assert mock_pipeline.transcribe.call_args.kwargs["batch_size"] == 16
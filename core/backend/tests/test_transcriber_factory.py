@@ -0,0 +1,47 @@
+import pytest
+from config import TranscriptionMode
+from services.transcriber_factory import TranscriberFactory
+
+
+class FakeTranscriber:
+    is_ready = True
+
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_reuses_and_evicts(monkeypatch):
+    monkeypatch.setattr(TranscriberFactory, "_warm", type(TranscriberFactory._warm)())
+    monkeypatch.setattr(TranscriberFactory, "WARM_POOL_SIZE", 2)
+    for name in ("_create_local", "_create_openai", "_create_deepgram"):
+        async def create(cls=None):
+            return FakeTranscriber()
+        monkeypatch.setattr(TranscriberFactory, name, create)
+
+    local = await TranscriberFactory.create(TranscriptionMode.LOCAL)
+    assert await TranscriberFactory.create(TranscriptionMode.LOCAL) is local
+
+    await TranscriberFactory.create(TranscriptionMode.OPENAI)
+    await TranscriberFactory.create(TranscriptionMode.DEEPGRAM)
+
+    assert local.closed
+    assert await TranscriberFactory.create(TranscriptionMode.LOCAL) is not local
+
+
+def test_baked_model_used_only_for_matching_size(monkeypatch, tmp_path):
+    from config import Settings
+    from services import transcriber_factory
+
+    (tmp_path / "faster-whisper-small").mkdir()
+
+    monkeypatch.setattr(transcriber_factory, "settings", Settings(whisper_models_dir=str(tmp_path)))
+    assert transcriber_factory._local_model() == str(tmp_path / "faster-whisper-small")
+
+    monkeypatch.setattr(transcriber_factory, "settings", Settings(
+        whisper_models_dir=str(tmp_path), whisper_model_size="medium"
+    ))
+    assert transcriber_factory._local_model() == "medium"
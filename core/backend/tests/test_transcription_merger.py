@@ -0,0 +1,41 @@
+from services.transcription_merger import TranscriptionMerger
+
+
+def _chunk(*segments):
+    return {"segments": [{"start": s, "end": e, "text": t} for s, e, t in segments]}
+
+
+def test_merge_uses_real_chunk_starts():
+    chunks = [_chunk((0.0, 2.0, "first")), _chunk((1.0, 3.0, "second"))]
+
+    merged = TranscriptionMerger.merge_segments(chunks, chunk_starts=[0.0, 420.5])
+
+    assert [(s["start"], s["text"]) for s in merged] == [(0.0, "first"), (421.5, "second")]
+
+
+def test_merge_drops_duplicate_text_in_overlap_only():
+    chunks = [
+        _chunk((0.0, 5.0, "Hello there."), (5.0, 10.0, "General Kenobi")),
+        _chunk((0.0, 2.0, "general kenobi!"), (1.0, 3.0, "You are a bold one")),
+    ]
+
+    merged = TranscriptionMerger.merge_segments(chunks, chunk_starts=[0.0, 8.0])
+
+    assert [s["text"] for s in merged] == ["Hello there.", "General Kenobi", "You are a bold one"]
+
+
+def test_merge_falls_back_to_fixed_step():
+    chunks = [_chunk((0.0, 1.0, "a")), _chunk((0.0, 1.0, "b"))]
+
+    merged = TranscriptionMerger.merge_segments(chunks)
+
+    assert merged[1]["start"] == 600.0
+
+
+def test_merge_collapses_several_duplicates_in_overlap():
+    first = _chunk((0.0, 3.0, "one"), (3.0, 6.0, "two"), (6.0, 9.0, "three"), (9.0, 12.0, "four"))
+    second = _chunk((0.0, 2.0, "Two."), (2.0, 5.0, "three"), (5.0, 7.0, "FOUR"), (7.0, 9.0, "five"))
+
+    merged = TranscriptionMerger.merge_segments([first, second], chunk_starts=[0.0, 4.0])
+
+    assert [s["text"] for s in merged] == ["one", "two", "three", "four", "five"]
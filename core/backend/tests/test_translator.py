@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from services.translator import TranslationService
+
+
+class FakeTranslator(TranslationService):
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _translate_batch_once(self, batch, target_lang, source_lang="auto"):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return [text.upper() for text in batch]
+
+
+@pytest.mark.asyncio
+async def test_translate_batch_runs_batches_concurrently_in_order():
+    service = FakeTranslator()
+    texts = [f"line {i}" for i in range(25)]
+
+    result = await service.translate_batch(texts, "fr", batch_size=5)
+
+    assert result == [t.upper() for t in texts]
+    assert service.max_in_flight > 1
+
+
+@pytest.mark.asyncio
+async def test_translate_batch_keeps_parsed_segments_and_caches_only_those(monkeypatch):
+    from config import Settings
+
+    service = TranslationService()
+    sent = []
+    replies = ["<<<SEG 1>>>\nMONDE"]
+
+    async def fake_llm(text, target_lang, source_lang):
+        sent.append(text)
+        return {"translated": replies.pop(0)}
+
+    monkeypatch.setattr("config.get_settings", lambda: Settings(groq_api_key="key"))
+    monkeypatch.setattr(service, "_translate_llm", fake_llm)
+
+    # SEG 0 lost its tag: it keeps the original, SEG 1 is still used
+    assert await service.translate_batch(["hello", "world"], "fr") == ["hello", "MONDE"]
+
+    # Only the parsed segment was cached, so just the other one is resent
+    replies.append("<<<SEG 0>>>\nBONJOUR")
+    assert await service.translate_batch(["world", "hello"], "fr") == ["MONDE", "BONJOUR"]
+    assert sent[-1] == "<<<SEG 0>>>\nhello"
+
+
+@pytest.mark.asyncio
+async def test_translate_batch_sends_plain_lines_to_google(monkeypatch):
+    from config import Settings
+
+    service = TranslationService()
+    sent = []
+
+    async def fake_google(text, target_lang, source_lang):
+        sent.append(text)
+        return {"translated": text.upper()}
+
+    monkeypatch.setattr("config.get_settings", lambda: Settings())
+    monkeypatch.setattr(service, "_translate_google", fake_google)
+
+    assert await service.translate_batch(["hello", "two\nlines"], "fr") == ["HELLO", "TWO LINES"]
+    assert sent == ["hello\ntwo lines"]
+
+
+def test_split_tagged_tolerates_whitespace_drift():
+    from services.translator import _split_tagged
+
+    reply = "<<<SEG 0>>> Bonjour\n<<< SEG 1 >>>\n\n\nle monde\n<<<SEG 2>>>\nsalut"
+
+    assert _split_tagged(reply, 3) == ["Bonjour", "le monde", "salut"]
+    assert _split_tagged(reply, 4) == ["Bonjour", "le monde", "salut", None]
+
+
+@pytest.mark.asyncio
+async def test_translation_cache_persists_across_instances(tmp_path):
+    from services.translation_cache import TranslationCache
+
+    db_path = tmp_path / "translations.sqlite3"
+    cache = TranslationCache(db_path)
+    assert await cache.get("hello", "fr", "en") is None
+    await cache.put("hello", "fr", "en", "bonjour")
+    assert await cache.get("hello", "fr", "en") == "bonjour"
+    await cache.close()
+
+    reopened = TranslationCache(db_path)
+    assert await reopened.get("hello", "fr", "en") == "bonjour"
+    assert await reopened.get("hello", "de", "en") is None
+    await reopened.close()
+
+    fresh = TranslationCache(db_path)
+    assert await fresh.get_many(["hello", "bye", "hello"], "fr", "en") == ["bonjour", None, "bonjour"]
+    await fresh.close()
@@ -0,0 +1,24 @@
+from services.video_processor import VideoProcessor
+
+
+def test_write_srt_streams_cues(tmp_path):
+    srt_path = tmp_path / "subtitles.srt"
+    segments = [
+        {"start": 0.0, "end": 1.5, "text": "Hello"},
+        {"start": 61.25, "end": 3723.5, "text": "World", "translated": "Monde"},
+    ]
+
+    VideoProcessor()._write_srt(srt_path, segments)
+
+    assert srt_path.read_text(encoding="utf-8") == (
+        "1\n00:00:00,000 --> 00:00:01,500\nHello\n\n"
+        "2\n00:01:01,250 --> 01:02:03,500\nMonde\n\n"
+    )
+
+
+def test_seconds_to_srt_time():
+    to_time = VideoProcessor._seconds_to_srt_time
+
+    assert to_time(0) == "00:00:00,000"
+    assert to_time(3723.042) == "01:02:03,042"
+    assert to_time(59.9999) == "00:01:00,000"
@@ -1,25 +1,54 @@
+# Resizing is the slow part; on x86_64 `pip install pillow-simd` (drop-in for
+# pillow, same API) runs the LANCZOS kernel with SSE4/AVX2. Stock pillow on ARM.
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from PIL import Image
 import os
 
+try:
+    # Optional: lossless MozJPEG trellis pass over Pillow's output
+    import mozjpeg_lossless_optimization
+except ImportError:
+    mozjpeg_lossless_optimization = None
+
 files = {
     "Marquee_Promo_1400x560.png": (1400, 560),
     "Small_Promo_440x280.png": (440, 280),
     "Screenshot_1280x800.png": (1280, 800)
 }
 
-for filename, size in files.items():
-    if os.path.exists(filename):
-        try:
-            with Image.open(filename) as img:
-                 print(f"Processing {filename}...")
-                 # Convert to RGB to drop alpha channel (transparency)
-                 rgb_img = img.convert('RGB')
-                 # Resize force
-                 resized_img = rgb_img.resize(size, Image.Resampling.LANCZOS)
-                 # Save as JPG
-                 new_name = filename.replace(".png", ".jpg")
-                 resized_img.save(new_name, "JPEG", quality=95)
-                 print(f"Converted {filename} -> {new_name} ({size})")
-        except Exception as e:
-            print(f"Error processing {filename}: {e}")
-            
+def process(item):
+    filename, size = item
+    try:
+        # Sources are always PNG, so skip probing every registered decoder
+        with Image.open(filename, formats=("PNG",)) as img:
+             print(f"Processing {filename}...")
+             # Convert to RGB to drop alpha channel (transparency); convert()
+             # copies even when the mode already matches, so skip it for RGB
+             rgb_img = img if img.mode == 'RGB' else img.convert('RGB')
+             # Resize force (exact store size, so not thumbnail()); reducing_gap
+             # does a cheap box prepass so LANCZOS only sees ~3x the target pixels
+             resized_img = rgb_img.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+             # Save as JPG
+             new_name = filename.replace(".png", ".jpg")
+             # Display-only store images, so 4:2:0 chroma is not noticeable
+             buf = BytesIO()
+             resized_img.save(buf, "JPEG", quality=92, optimize=True, progressive=True, subsampling="4:2:0")
+             data = buf.getvalue()
+             if mozjpeg_lossless_optimization is not None:
+                 data = mozjpeg_lossless_optimization.optimize(data)
+             with open(new_name, "wb") as out:
+                 out.write(data)
+             print(f"Converted {filename} -> {new_name} ({size})")
+    except Exception as e:
+        print(f"Error processing {filename}: {e}")
+
+# One directory read instead of an exists() check per asset
+with os.scandir('.') as entries:
+    present = {e.name for e in entries if e.is_file()}
+todo = [item for item in files.items() if item[0] in present]
+
+# Pillow releases the GIL in decode/resize/encode, so threads convert the files concurrently
+if todo:
+    with ThreadPoolExecutor(max_workers=min(len(todo), os.cpu_count() or 1)) as ex:
+        list(ex.map(process, todo))
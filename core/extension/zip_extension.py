@@ -1,23 +1,56 @@
+import argparse
 import zipfile
 import os
 
+EXCLUDED_DIRS = frozenset(['node_modules', 'tests', 'test', '.git', 'bypass-subtitles-extension.zip', 'store_assets'])
+EXCLUDED_FILES = frozenset(['package-lock.json', 'zip_extension.py', 'bypass-subtitles-extension.zip', '.DS_Store'])
+# Already-compressed formats: deflate only burns CPU and can grow them
+STORED_EXTS = frozenset(['.png', '.jpg', '.jpeg', '.gif', '.webp', '.woff', '.woff2', '.gz', '.br'])
+
+def collect_files(path):
+    """(file_path, arcname) for everything that goes in the zip, in one scandir pass."""
+    prefix = len(path) + 1
+    found = []
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                # Exclude node_modules and other unwanted dirs
+                if entry.is_dir():
+                    if entry.name not in EXCLUDED_DIRS:
+                        stack.append(entry.path)
+                    continue
+                if entry.name in EXCLUDED_FILES or entry.name.endswith(('.zip', '.py')):
+                    continue
+                found.append((entry.path, entry.path[prefix:]))
+    # Sorted only so the archive's entry order is deterministic; each entry is
+    # deflated independently, so order does not affect size
+    found.sort(key=lambda item: item[1])
+    return found
+
 def zipdir(path, ziph):
     # ziph is zipfile handle
-    for root, dirs, files in os.walk(path):
-        # Exclude node_modules and other unwanted dirs
-        dirs[:] = [d for d in dirs if d not in ['node_modules', 'tests', 'test', '.git', 'bypass-subtitles-extension.zip', 'store_assets']]
-        
-        for file in files:
-            if file in ['package-lock.json', 'zip_extension.py', 'bypass-subtitles-extension.zip', '.DS_Store']:
-                continue
-            if file.endswith('.zip') or file.endswith('.py'):
-                continue
-                
-            file_path = os.path.join(root, file)
-            arcname = os.path.relpath(file_path, os.path.join(path, '.'))
+    for file_path, arcname in collect_files(os.path.normpath(path)):
+        # write() already streams each file through the compressor in blocks,
+        # so large assets (wasm, models) are never read into memory whole
+        if os.path.splitext(arcname)[1].lower() in STORED_EXTS:
+            ziph.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+        else:
             ziph.write(file_path, arcname)
 
 if __name__ == '__main__':
-    with zipfile.ZipFile('bypass-subtitles-extension.zip', 'w', zipfile.ZIP_DEFLATED) as zipf:
+    parser = argparse.ArgumentParser(description="Package the extension for the Chrome Web Store")
+    # Release default: built once per store upload, so spend the time on the smallest deflate
+    parser.add_argument('--level', type=int, choices=[1, 6, 9], default=9, help="deflate level")
+    # Dev builds: skip compression entirely (also set by ZIP_FAST=1)
+    parser.add_argument('--store', action='store_true', default=os.environ.get('ZIP_FAST') == '1',
+                        help="store files uncompressed")
+    args = parser.parse_args()
+
+    if args.store:
+        method, level = zipfile.ZIP_STORED, None
+    else:
+        method, level = zipfile.ZIP_DEFLATED, args.level
+    with zipfile.ZipFile('bypass-subtitles-extension.zip', 'w', method, compresslevel=level) as zipf:
         zipdir('.', zipf)
     print("Zipped extension successfully.")